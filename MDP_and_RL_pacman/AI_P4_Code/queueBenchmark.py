@@ -0,0 +1,83 @@
+# queueBenchmark.py
+# -----------------
+# Micro-benchmark of util.PriorityQueue against util.IndexedPriorityQueue.
+#
+# > python queueBenchmark.py -n 100000 -u 2000
+#
+# The workload pushes n items with random priorities, applies u decrease-key
+# updates to random queued items (the access pattern of prioritized sweeping)
+# and then pops the queue empty.  Both queues must pop the same sequence.
+
+import optparse
+import random
+import time
+
+import util
+
+
+def makeWorkload(numItems, numUpdates, seed):
+    rand = random.Random(seed)
+    pushes = [(i, rand.random()) for i in range(numItems)]
+    updates = [(rand.randrange(numItems), -rand.random()) for _ in range(numUpdates)]
+    return pushes, updates
+
+
+def runWorkload(queueClass, pushes, updates):
+    "Returns (seconds spent in push, update and pop, popped items)"
+    queue = queueClass()
+    timings = []
+
+    start = time.perf_counter()
+    for item, priority in pushes:
+        queue.push(item, priority)
+    timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for item, priority in updates:
+        queue.update(item, priority)
+    timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    popped = []
+    while not queue.isEmpty():
+        popped.append(queue.pop())
+    timings.append(time.perf_counter() - start)
+    return timings, popped
+
+
+def parseOptions():
+    optParser = optparse.OptionParser()
+    optParser.add_option('-n', '--numItems', action='store',
+                         type='int', dest='numItems', default=100000,
+                         help='Number of items pushed (default %default)')
+    optParser.add_option('-u', '--numUpdates', action='store',
+                         type='int', dest='numUpdates', default=2000,
+                         help='Number of decrease-key updates (default %default)')
+    optParser.add_option('-s', '--seed', action='store',
+                         type='int', dest='seed', default=0,
+                         help='Random seed for the workload (default %default)')
+    optParser.add_option('--skipLinear', action='store_true',
+                         dest='skipLinear', default=False,
+                         help='Only time IndexedPriorityQueue')
+    opts, args = optParser.parse_args()
+    return opts
+
+
+if __name__ == '__main__':
+    opts = parseOptions()
+    pushes, updates = makeWorkload(opts.numItems, opts.numUpdates, opts.seed)
+
+    queueClasses = [util.IndexedPriorityQueue]
+    if not opts.skipLinear:
+        queueClasses.insert(0, util.PriorityQueue)
+
+    print('%d items, %d updates' % (opts.numItems, opts.numUpdates))
+    print('%-22s %10s %10s %10s' % ('queue', 'push (s)', 'update (s)', 'pop (s)'))
+    results = []
+    for queueClass in queueClasses:
+        timings, popped = runWorkload(queueClass, pushes, updates)
+        results.append(popped)
+        print('%-22s %10.3f %10.3f %10.3f' % ((queueClass.__name__,) + tuple(timings)))
+
+    if len(results) > 1 and results[0] != results[-1]:
+        raise Exception('The queues popped different sequences of items')
@@ -209,7 +209,7 @@ class PrioritizedSweepingValueIterationAgent(AsynchronousValueIterationAgent):
                     if prob > 0:
                         predecessors[next_state].add(s)
 
-        pq = util.PriorityQueue()
+        pq = util.IndexedPriorityQueue()
 
         # For each non-terminal state s, compute initial diff and push into pq
         for s in states:
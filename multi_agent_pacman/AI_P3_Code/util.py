@@ -233,6 +233,121 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class IndexedPriorityQueue(PriorityQueue):
+    """
+    A PriorityQueue that holds at most one entry per item and keeps an
+    item -> heap slot index alongside the heap.  This makes update
+    (decrease-key), push and pop O(log n) and contains/priorityOf O(1),
+    instead of the linear scan plus heapify done by PriorityQueue.update.
+
+    Items must be hashable.  Ties are broken in insertion order, exactly as
+    in PriorityQueue, so both queues pop the same sequence of items.
+    """
+
+    def __init__(self):
+        PriorityQueue.__init__(self)
+        self.index = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def push(self, item, priority):
+        "Adds an item, or moves it to 'priority' if it is already queued"
+        entry = (priority, self.count, item)
+        self.count += 1
+        if item in self.index:
+            pos = self.index[item]
+            self.heap[pos] = entry
+            self._siftUp(pos)
+            self._siftDown(self.index[item])
+        else:
+            self.heap.append(entry)
+            self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if not heap:
+            del self.index[last[2]]
+            return last[2]
+        (_, _, item) = heap[0]
+        del self.index[item]
+        heap[0] = last
+        self._siftDown(0)
+        return item
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update: lower the priority of a
+        # queued item, ignore a higher one, and push the item if it is absent.
+        pos = self.index.get(item)
+        if pos is None:
+            self.push(item, priority)
+            return
+        (p, c, _) = self.heap[pos]
+        if p <= priority:
+            return
+        self.heap[pos] = (priority, c, item)
+        self._siftUp(pos)
+
+    def contains(self, item):
+        return item in self.index
+
+    def priorityOf(self, item):
+        "Returns the priority of a queued item; raises KeyError otherwise"
+        return self.heap[self.index[item]][0]
+
+    def _siftUp(self, pos):
+        heap, index = self.heap, self.index
+        entry = heap[pos]
+        while pos > 0:
+            parentPos = (pos - 1) >> 1
+            parent = heap[parentPos]
+            if not entry < parent:
+                break
+            heap[pos] = parent
+            index[parent[2]] = pos
+            pos = parentPos
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+    def _siftDown(self, pos):
+        heap, index = self.heap, self.index
+        end = len(heap)
+        entry = heap[pos]
+        child = 2 * pos + 1
+        while child < end:
+            right = child + 1
+            if right < end and heap[right] < heap[child]:
+                child = right
+            if not heap[child] < entry:
+                break
+            heap[pos] = heap[child]
+            index[heap[pos][2]] = pos
+            pos = child
+            child = 2 * pos + 1
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+
+class IndexedPriorityQueueWithFunction(IndexedPriorityQueue):
+    """
+    The IndexedPriorityQueue counterpart of PriorityQueueWithFunction: push
+    takes only the item and asks the priority function for its priority.
+    """
+
+    def __init__(self, priorityFunction):
+        "priorityFunction (item) -> priority"
+        self.priorityFunction = priorityFunction
+        IndexedPriorityQueue.__init__(self)
+
+    def push(self, item):
+        "Adds an item to the queue with priority from the priority function"
+        IndexedPriorityQueue.push(self, item, self.priorityFunction(item))
+
+
 def manhattanDistance(xy1, xy2):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs(xy1[0] - xy2[0]) + abs(xy1[1] - xy2[1])
@@ -14,6 +14,13 @@
 
 import search
 import random
+import os
+from collections import deque
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # Module Classes
 
@@ -145,6 +152,16 @@ class EightPuzzleState:
 
         return newPuzzle
 
+    def encode(self):
+        """
+          Returns the puzzle as one int (see encodePuzzle), the state used by
+        SlidingPuzzleSearchProblem.
+
+        >>> decodePuzzle(EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).encode(), 3)
+        [1, 0, 2, 3, 4, 5, 6, 7, 8]
+        """
+        return encodePuzzle([number for row in self.cells for number in row])
+
     # Utilities for comparison and display
     def __eq__(self, other):
         """
@@ -196,7 +213,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -221,6 +238,256 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         """
         return len(actions)
 
+# Compact sliding puzzles
+#
+# A size x size puzzle is packed into one int: 4 bits per cell, cell i in
+# bits 4(i+1) to 4(i+1)+3, and the position of the blank in the lowest 4
+# bits, so equality and hashing are single int operations and a move is a
+# few shifts.  Cells are numbered row by row, as in EightPuzzleState, and the
+# goal has the blank in cell 0 and tile i in cell i.
+
+def encodePuzzle(numbers):
+    "Packs a list of cell values (0 for the blank) into an int"
+    code = numbers.index(0)
+    for cell, number in enumerate(numbers):
+        code |= number << (4 * cell + 4)
+    return code
+
+def decodePuzzle(code, size):
+    "Returns the list of cell values packed in code"
+    return [(code >> (4 * cell + 4)) & 15 for cell in range(size * size)]
+
+_BLANK_MOVES = {}
+
+def blankMoves(size):
+    """
+      Returns, for each cell, the (cell, move) pairs the blank can move to, in
+    the order of EightPuzzleState.legalMoves.
+    """
+    if size not in _BLANK_MOVES:
+        moves = []
+        for cell in range(size * size):
+            row, col = divmod(cell, size)
+            cellMoves = []
+            if row != 0:
+                cellMoves.append((cell - size, 'up'))
+            if row != size - 1:
+                cellMoves.append((cell + size, 'down'))
+            if col != 0:
+                cellMoves.append((cell - 1, 'left'))
+            if col != size - 1:
+                cellMoves.append((cell + 1, 'right'))
+            moves.append(tuple(cellMoves))
+        _BLANK_MOVES[size] = moves
+    return _BLANK_MOVES[size]
+
+class SlidingPuzzleSearchProblem(search.SearchProblem):
+    """
+      The eight puzzle, or any size x size sliding puzzle such as the fifteen
+    puzzle, with states packed into ints (see encodePuzzle).  Actions are the
+    moves of EightPuzzleState.
+
+    >>> problem = SlidingPuzzleSearchProblem([1, 0, 2, 3, 4, 5, 6, 7, 8])
+    >>> search.breadthFirstSearch(problem)
+    ['left']
+    """
+    def __init__(self, numbers, size=None):
+        if size is None:
+            size = int(round(len(numbers) ** 0.5))
+        if size * size != len(numbers) or sorted(numbers) != list(range(size * size)):
+            raise ValueError('not a %d x %d sliding puzzle: %s' % (size, size, numbers))
+        self.size = size
+        self.start = encodePuzzle(list(numbers))
+        self.goal = encodePuzzle(list(range(size * size)))
+        self.moves = blankMoves(size)
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.start
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        """
+          Returns list of (successor, action, stepCost) pairs for the moves of
+        the blank; the cost is 1 for each
+        """
+        self._expanded += 1
+        blank = state & 15
+        blankShift = 4 * blank + 4
+        succ = []
+        for cell, move in self.moves[blank]:
+            shift = 4 * cell + 4
+            tile = (state >> shift) & 15
+            succ.append((state - (tile << shift) + (tile << blankShift) - blank + cell, move, 1))
+        return succ
+
+    def getCostOfActions(self, actions):
+        return len(actions)
+
+class PatternDatabase:
+    """
+      An additive pattern database for a size x size sliding puzzle.  The
+    tiles are split into disjoint groups; for each group a table holds the
+    fewest moves of that group's tiles needed to bring them home from any
+    placement, found by a backward breadth-first search from the goal in
+    which moving any other tile is free.  Because every move moves one tile,
+    the values of the groups add up to an admissible and consistent
+    heuristic.
+
+    A table is indexed by the cells of the group's tiles, one base
+    size*size digit per tile, and stored as bytes.
+    """
+    def __init__(self, size, groups, tables=None):
+        self.size = size
+        self.groups = [tuple(group) for group in groups]
+        if tables is None:
+            tables = [self._buildTable(group) for group in self.groups]
+        self.tables = tables
+
+    def _buildTable(self, group):
+        n, k = self.size * self.size, len(group)
+        weights = [n ** i for i in range(k + 1)] # the last digit is the blank's cell
+        # 0-1 breadth-first search over (group cells, blank cell)
+        distances = bytearray(b'\xff') * (n ** (k + 1))
+        start = sum([tile * weights[i] for i, tile in enumerate(group)])
+        distances[start] = 0
+        queue = deque([(start, 0)])
+        moves = blankMoves(self.size)
+        while queue:
+            index, distance = queue.popleft()
+            if distance > distances[index]:
+                continue
+            occupants = {}
+            rest = index
+            for i in range(k):
+                rest, cell = divmod(rest, n)
+                occupants[cell] = i
+            blank = rest
+            for cell, move in moves[blank]:
+                nextIndex = index + (cell - blank) * weights[k]
+                tile = occupants.get(cell)
+                if tile is None:
+                    if distance < distances[nextIndex]:
+                        distances[nextIndex] = distance
+                        queue.appendleft((nextIndex, distance))
+                else:
+                    nextIndex += (blank - cell) * weights[tile]
+                    if distance + 1 < distances[nextIndex]:
+                        distances[nextIndex] = distance + 1
+                        queue.append((nextIndex, distance + 1))
+        # the heuristic does not look at the blank: keep the best blank cell
+        size = n ** k
+        table = distances[:size]
+        for blank in range(1, n):
+            table = bytes(map(min, table, distances[blank * size:(blank + 1) * size]))
+        return bytes(table)
+
+    def getValue(self, state):
+        "The heuristic value of a packed puzzle state"
+        cells = [0] * (self.size * self.size)
+        shift = 4
+        for cell in range(len(cells)):
+            cells[(state >> shift) & 15] = cell
+            shift += 4
+        value = 0
+        n = len(cells)
+        for group, table in zip(self.groups, self.tables):
+            index = 0
+            for tile in reversed(group):
+                index = index * n + cells[tile]
+            value += table[index]
+        return value
+
+    def fileNames(self, directory):
+        return [os.path.join(directory, 'puzzle%d.%s.npy' % (self.size, '-'.join(map(str, group))))
+                for group in self.groups]
+
+    def save(self, directory):
+        """
+          Writes one .npy file per group to directory.  Each file is written
+        under a temporary name first, so a run that loads it concurrently never
+        sees a partial file.
+        """
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        for fileName, table in zip(self.fileNames(directory), self.tables):
+            temporary = '%s.%d.tmp' % (fileName, os.getpid())
+            with open(temporary, 'wb') as f:
+                numpy.save(f, numpy.frombuffer(table, dtype=numpy.uint8))
+            os.replace(temporary, fileName)
+
+    @staticmethod
+    def load(size, groups, directory):
+        """
+          Returns the database read from files written by save, or None if a
+        file is missing or does not fit the groups.
+        """
+        database = PatternDatabase(size, groups, [])
+        for fileName, group in zip(database.fileNames(directory), database.groups):
+            try:
+                table = numpy.load(fileName)
+            except (OSError, ValueError):
+                return None
+            if table.dtype != numpy.uint8 or table.shape != ((size * size) ** len(group),):
+                return None
+            database.tables.append(table.tobytes())
+        return database
+
+# Tile groups of the default databases: tiles with neighbouring goal cells
+PATTERN_GROUPS = {
+    3: [(1, 2, 4, 5), (3, 6, 7, 8)],
+    4: [(1, 4, 5), (2, 3, 6, 7), (8, 9, 12, 13), (10, 11, 14, 15)],
+}
+
+# Directory databases are saved in between runs (if numpy is available), from
+# the environment variable PACMAN_PATTERN_DATABASE_DIR; None (the default)
+# keeps them in memory only.  The databases built or loaded in this run:
+PATTERN_DATABASE_DIR = os.environ.get('PACMAN_PATTERN_DATABASE_DIR') or None
+PATTERN_DATABASES = {}
+
+def getPatternDatabase(size, groups=None):
+    """
+      Returns the PatternDatabase for a size x size puzzle, building it on
+    first use.  If PATTERN_DATABASE_DIR is set, it is loaded from there
+    instead when possible, and saved there after it is built.
+    """
+    if groups is None:
+        groups = PATTERN_GROUPS[size]
+    key = (size, tuple(map(tuple, groups)))
+    if key not in PATTERN_DATABASES:
+        persist = numpy is not None and PATTERN_DATABASE_DIR is not None
+        database = None
+        if persist:
+            database = PatternDatabase.load(size, groups, PATTERN_DATABASE_DIR)
+        if database is None:
+            database = PatternDatabase(size, groups)
+            if persist:
+                try:
+                    database.save(PATTERN_DATABASE_DIR)
+                except OSError:
+                    pass
+        PATTERN_DATABASES[key] = database
+    return PATTERN_DATABASES[key]
+
+def patternDatabaseHeuristic(state, problem):
+    "The additive pattern database heuristic for a SlidingPuzzleSearchProblem"
+    if 'patternDatabase' not in problem.__dict__:
+        problem.patternDatabase = getPatternDatabase(problem.size)
+    return problem.patternDatabase.getValue(state)
+
+def solvePuzzle(puzzle, fn='idastar'):
+    """
+      Returns an optimal list of moves that solves puzzle, an EightPuzzleState
+    or a list of cell values of any size x size puzzle, using the search
+    function fn of search.py with patternDatabaseHeuristic.
+    """
+    if isinstance(puzzle, EightPuzzleState):
+        puzzle = decodePuzzle(puzzle.encode(), 3)
+    problem = SlidingPuzzleSearchProblem(puzzle)
+    return getattr(search, fn)(problem, heuristic=patternDatabaseHeuristic)
+
 EIGHT_PUZZLE_DATA = [[1, 0, 2, 3, 4, 5, 6, 7, 8],
                      [1, 7, 8, 2, 3, 4, 5, 6, 0],
                      [4, 3, 2, 7, 0, 5, 1, 6, 8],
@@ -267,9 +534,8 @@ if __name__ == '__main__':
     print('A random puzzle:')
     print(puzzle)
 
-    problem = EightPuzzleSearchProblem(puzzle)
-    path = search.breadthFirstSearch(problem)
-    print('BFS found a path of %d moves: %s' % (len(path), str(path)))
+    path = solvePuzzle(puzzle)
+    print('IDA* with pattern databases found a path of %d moves: %s' % (len(path), str(path)))
     curr = puzzle
     i = 1
     for a in path:
@@ -74,11 +74,16 @@ class Configuration:
 
     The convention for positions, like a graph, is that (0,0) is the lower left corner, x increases
     horizontally and y increases vertically.  Therefore, north is the direction of increasing y, or (0,1).
+
+    Configurations are shared between states and never changed once made, so
+    the hash is computed once.  Moves at speed 1 keep integer positions.
     """
+    __slots__ = ('pos', 'direction', '_hash')
 
     def __init__(self, pos, direction):
         self.pos = pos
         self.direction = direction
+        self._hash = None
 
     def getPosition(self):
         return (self.pos)
@@ -95,9 +100,11 @@ class Configuration:
         return (self.pos == other.pos and self.direction == other.direction)
 
     def __hash__(self):
-        x = hash(self.pos)
-        y = hash(self.direction)
-        return hash(x + 13 * y)
+        if self._hash is None:
+            x = hash(self.pos)
+            y = hash(self.direction)
+            self._hash = hash(x + 13 * y)
+        return self._hash
 
     def __str__(self):
         return "(x,y)="+str(self.pos)+", "+str(self.direction)
@@ -112,7 +119,9 @@ class Configuration:
         """
         x, y= self.pos
         dx, dy = vector
-        direction = Actions.vectorToDirection(vector)
+        direction = Actions._vectorDirections.get(vector)
+        if direction is None:
+            direction = Actions.vectorToDirection(vector)
         if direction == Directions.STOP:
             direction = self.direction # There is no stop direction
         return Configuration((x + dx, y+dy), direction)
@@ -121,6 +130,7 @@ class AgentState:
     """
     AgentStates hold the state of an agent (configuration, speed, scared, etc).
     """
+    __slots__ = ('start', 'configuration', 'isPacman', 'scaredTimer', 'numCarrying', 'numReturned')
 
     def __init__( self, startConfiguration, isPacman ):
         self.start = startConfiguration
@@ -145,7 +155,9 @@ class AgentState:
         return hash(hash(self.configuration) + 13 * hash(self.scaredTimer))
 
     def copy( self ):
-        state = AgentState( self.start, self.isPacman )
+        state = AgentState.__new__( AgentState )
+        state.start = self.start
+        state.isPacman = self.isPacman
         state.configuration = self.configuration
         state.scaredTimer = self.scaredTimer
         state.numCarrying = self.numCarrying
@@ -166,7 +178,15 @@ class Grid:
     y vertical and the origin (0,0) in the bottom left corner.
 
     The __str__ method constructs an output that is oriented like a pacman board.
+
+    After useBitGrids(), Grid(...) creates BitGrids instead.
     """
+    def __new__(cls, *args, **kwargs):
+        # unpickling calls __new__ without arguments and must keep the class
+        if cls is Grid and USE_BIT_GRIDS and args:
+            cls = BitGrid
+        return object.__new__(cls)
+
     def __init__(self, width, height, initialValue=False, bitRepresentation=None):
         if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
         self.CELLS_PER_INT = 30
@@ -204,7 +224,7 @@ class Grid:
         return hash(h)
 
     def copy(self):
-        g = Grid(self.width, self.height)
+        g = self._emptyCopy()
         g.data = [x[:] for x in self.data]
         return g
 
@@ -212,10 +232,18 @@ class Grid:
         return self.copy()
 
     def shallowCopy(self):
-        g = Grid(self.width, self.height)
+        g = self._emptyCopy()
         g.data = self.data
         return g
 
+    def _emptyCopy(self):
+        # not Grid(...), which makes a BitGrid after useBitGrids()
+        g = object.__new__(type(self))
+        g.CELLS_PER_INT = self.CELLS_PER_INT
+        g.width = self.width
+        g.height = self.height
+        return g
+
     def count(self, item =True ):
         return sum([x.count(item) for x in self.data])
 
@@ -274,12 +302,242 @@ class Grid:
                 bools.append(False)
         return bools
 
+class BitGrid(Grid):
+    """
+    A Grid backed by the bits of one int instead of a list of lists: cell
+    (x, y) is bit x * height + y, the order of asList and packBits.  count is
+    a popcount, hashing and equality look at one int, copy shares the int
+    and asList is cached until the grid changes.  grid[x][y] reads and
+    writes go through a small column view.
+
+    grid.data still returns a list of lists, but as a copy: writes to it are
+    not seen by the grid.
+    """
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        self._columns = None
+        self._list = None # (bits, asList()) of the last asList call
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def __getitem__(self, i):
+        if self._columns is None:
+            self._columns = [_BitGridColumn(self, x * self.height) for x in range(self.width)]
+        return self._columns[i]
+
+    def __setitem__(self, key, item):
+        column = self[key]
+        for y, value in enumerate(item):
+            column[y] = value
+
+    @property
+    def data(self):
+        return [[self[x][y] for y in range(self.height)] for x in range(self.width)]
+
+    def __eq__(self, other):
+        if other == None: return False
+        if isinstance(other, BitGrid):
+            return self.bits == other.bits and self.width == other.width and self.height == other.height
+        return self.data == other.data
+
+    def __hash__(self):
+        # the int Grid.__hash__ builds cell by cell
+        return hash(self.bits)
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        g._list = self._list
+        return g
+
+    def shallowCopy(self):
+        # the int cannot be shared for writing, and copying it is cheap
+        return self.copy()
+
+    def count(self, item =True ):
+        if item:
+            return _popcount(self.bits)
+        return self.width * self.height - _popcount(self.bits)
+
+    def asList(self, key = True):
+        if not key:
+            return Grid.asList(self, key)
+        if self._list is None or self._list[0] != self.bits:
+            list = []
+            bits, height = self.bits, self.height
+            while bits:
+                lowest = bits & -bits
+                list.append(divmod(lowest.bit_length() - 1, height))
+                bits ^= lowest
+            self._list = (self.bits, list)
+        return self._list[1][:]
+
+class _BitGridColumn:
+    "Column x of a BitGrid, so that grid[x][y] works as with a Grid"
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, offset):
+        self.grid = grid
+        self.offset = offset
+
+    def __getitem__(self, y):
+        if not 0 <= y < self.grid.height: raise IndexError('grid index out of range')
+        return (self.grid.bits >> (self.offset + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if not 0 <= y < self.grid.height: raise IndexError('grid index out of range')
+        if value:
+            self.grid.bits |= 1 << (self.offset + y)
+        else:
+            self.grid.bits &= ~(1 << (self.offset + y))
+
+    def __len__(self):
+        return self.grid.height
+
+# Whether Grid(...) creates BitGrids (see useBitGrids)
+USE_BIT_GRIDS = False
+
+def useBitGrids(enabled=True):
+    """
+    Makes every Grid created from now on a BitGrid (or, with enabled=False,
+    a list-backed Grid again).  Grids that already exist keep their class,
+    and so do their copies:
+
+    >>> grid = Grid(3, 3)
+    >>> useBitGrids()
+    >>> type(Grid(3, 3)).__name__, type(grid.copy()).__name__, type(grid.shallowCopy()).__name__
+    ('BitGrid', 'Grid', 'Grid')
+    >>> useBitGrids(False)
+    """
+    global USE_BIT_GRIDS
+    USE_BIT_GRIDS = enabled
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
         return bitRep
     width, height = bitRep[:2]
     return Grid(width, height, bitRepresentation= bitRep[2:])
 
+class FoodIndex:
+    """
+    Numbers the food cells of one Grid so that a set of them can be stored as
+    the bits of an int: bit i of a FoodBits built from this index stands for
+    positions[i].  Cells are numbered in Grid.asList order.
+    """
+    def __init__(self, grid):
+        self.width = grid.width
+        self.height = grid.height
+        self.positions = tuple(grid.asList())
+        self.masks = dict((position, 1 << i) for i, position in enumerate(self.positions))
+        self.full = (1 << len(self.positions)) - 1
+
+class FoodBits:
+    """
+    An immutable set of food cells packed into a Python int, as a compact
+    alternative to a food Grid in search states.  Hashing and equality
+    compare one int, eat clears one bit and count is a popcount, where the
+    Grid equivalents walk or copy every cell.
+
+    FoodBits mimics the read-only part of the Grid interface (count, asList,
+    grid[x][y] and copy), so heuristics written for a food Grid accept it.
+    Use FoodBits.fromGrid and asGrid to convert.
+    """
+    __slots__ = ('index', 'bits')
+
+    def __init__(self, index, bits):
+        self.index = index
+        self.bits = bits
+
+    @staticmethod
+    def fromGrid(grid, index=None):
+        """
+        Packs the True cells of a Grid.  Sets that are compared with each
+        other must share one FoodIndex; by default a new one is built from
+        the grid.  A cell that is True in the grid but not numbered by the
+        index is ignored.
+        """
+        if index is None:
+            index = FoodIndex(grid)
+            return FoodBits(index, index.full)
+        bits = 0
+        for (x, y), mask in index.masks.items():
+            if grid[x][y]:
+                bits |= mask
+        return FoodBits(index, bits)
+
+    def asGrid(self):
+        "Unpacks the set into a new Grid"
+        grid = Grid(self.index.width, self.index.height)
+        for x, y in self.asList():
+            grid[x][y] = True
+        return grid
+
+    def __getitem__(self, x):
+        return _FoodBitsColumn(self, x)
+
+    def __eq__(self, other):
+        if not isinstance(other, FoodBits): return False
+        return self.bits == other.bits and self.index is other.index
+
+    def __hash__(self):
+        return hash(self.bits)
+
+    def __str__(self):
+        return str(self.asGrid())
+
+    def copy(self):
+        "FoodBits never change, so a copy is the set itself"
+        return self
+
+    def has(self, x, y):
+        mask = self.index.masks.get((x, y))
+        return mask is not None and self.bits & mask != 0
+
+    def eat(self, position):
+        "Returns the set without 'position' (the set itself if it has no food there)"
+        mask = self.index.masks.get(position)
+        if mask is None or not self.bits & mask:
+            return self
+        return FoodBits(self.index, self.bits & ~mask)
+
+    def count(self, item=True):
+        if item:
+            return _popcount(self.bits)
+        return self.index.width * self.index.height - _popcount(self.bits)
+
+    def asList(self, key=True):
+        if not key:
+            return self.asGrid().asList(False)
+        positions = self.index.positions
+        bits = self.bits
+        foodList = []
+        while bits:
+            lowest = bits & -bits
+            foodList.append(positions[lowest.bit_length() - 1])
+            bits ^= lowest
+        return foodList
+
+class _FoodBitsColumn:
+    "Supports grid[x][y] reads on a FoodBits"
+    __slots__ = ('food', 'x')
+
+    def __init__(self, food, x):
+        self.food = food
+        self.x = x
+
+    def __getitem__(self, y):
+        return self.food.has(self.x, y)
+
+try:
+    _popcount = int.bit_count
+except AttributeError: # before Python 3.10
+    _popcount = lambda bits: bin(bits).count('1')
+
 ####################################
 # Parts you shouldn't have to read #
 ####################################
@@ -297,6 +555,13 @@ class Actions:
 
     _directionsAsList = _directions.items()
 
+    # movement vectors at the speeds agents move at: 1 (integer vectors, so
+    # positions stay integers) and 0.5 (scared ghosts)
+    _speedVectors = {1.0: _directions,
+                     0.5: dict((direction, (dx * 0.5, dy * 0.5)) for direction, (dx, dy) in _directions.items())}
+    _vectorDirections = dict((vector, direction)
+                             for vectors in _speedVectors.values() for direction, vector in vectors.items())
+
     TOLERANCE = .001
 
     def reverseDirection(action):
@@ -325,11 +590,17 @@ class Actions:
     vectorToDirection = staticmethod(vectorToDirection)
 
     def directionToVector(direction, speed = 1.0):
+        vectors = Actions._speedVectors.get(speed)
+        if vectors is not None:
+            return vectors[direction]
         dx, dy =  Actions._directions[direction]
         return (dx * speed, dy * speed)
     directionToVector = staticmethod(directionToVector)
 
     def getPossibleActions(config, walls):
+        actions = getLegalMoveTable(walls).actions.get(config.pos)
+        if actions is not None: return list(actions)
+
         possible = []
         x, y = config.pos
         x_int, y_int = int(x + 0.5), int(y + 0.5)
@@ -349,6 +620,9 @@ class Actions:
     getPossibleActions = staticmethod(getPossibleActions)
 
     def getLegalNeighbors(position, walls):
+        neighbors = getLegalMoveTable(walls).neighbors.get(position)
+        if neighbors is not None: return list(neighbors)
+
         x,y = position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
         neighbors = []
@@ -368,6 +642,66 @@ class Actions:
         return (x + dx, y + dy)
     getSuccessor = staticmethod(getSuccessor)
 
+class LegalMoveTable:
+    """
+    The moves from every integer position of a wall Grid, worked out once so
+    that the rules look them up instead of checking walls on every call:
+
+      actions[(x, y)]            what Actions.getPossibleActions returns there
+      neighbors[(x, y)]          what Actions.getLegalNeighbors returns there
+      ghostActions[(x, y)][dir]  the moves of a ghost heading dir: no STOP,
+                                 and no reversing unless it is the only move
+
+    Positions between grid points (scared ghosts move at half speed) are not
+    in the tables; the Actions functions work those out as before.
+    """
+
+    def __init__(self, walls):
+        self.actions = {}
+        self.neighbors = {}
+        self.ghostActions = {}
+        for x in range(walls.width):
+            for y in range(walls.height):
+                position = (x, y)
+                neighbors = []
+                for dir, (dx, dy) in Actions._directionsAsList:
+                    next_x, next_y = x + dx, y + dy
+                    if 0 <= next_x < walls.width and 0 <= next_y < walls.height and not walls[next_x][next_y]:
+                        neighbors.append((next_x, next_y))
+                self.neighbors[position] = tuple(neighbors)
+
+                # cells on the border are left to getPossibleActions, which
+                # does not check the bounds
+                if not (0 < x < walls.width - 1 and 0 < y < walls.height - 1): continue
+                actions = tuple(dir for dir, (dx, dy) in Actions._directionsAsList if not walls[x + dx][y + dy])
+                self.actions[position] = actions
+                moves = [dir for dir in actions if dir != Directions.STOP]
+                ghostActions = {}
+                for direction in Directions.REVERSE:
+                    reverse = Directions.REVERSE[direction]
+                    if reverse in moves and len(moves) > 1:
+                        ghostActions[direction] = tuple(dir for dir in moves if dir != reverse)
+                    else:
+                        ghostActions[direction] = tuple(moves)
+                self.ghostActions[position] = ghostActions
+
+# LegalMoveTables by the contents of their wall Grid, since deep copies of a
+# game state get their own copy of the layout
+_LEGAL_MOVE_TABLES = {}
+
+def getLegalMoveTable(walls):
+    "Returns the LegalMoveTable of a wall Grid, building it on first use"
+    try:
+        return walls._legalMoveTable
+    except AttributeError:
+        pass
+    key = walls.packBits()
+    table = _LEGAL_MOVE_TABLES.get(key)
+    if table is None:
+        table = _LEGAL_MOVE_TABLES[key] = LegalMoveTable(walls)
+    walls._legalMoveTable = table
+    return table
+
 class GameStateData:
     """
 
@@ -375,15 +709,21 @@ class GameStateData:
     def __init__( self, prevState = None ):
         """
         Generates a new data packet by copying information from its predecessor.
+
+        The food grid, the capsule list and the agent states are shared with
+        the predecessor (copy on write): code that changes the new packet
+        replaces food and capsules with copies first and gets the agent
+        states it changes from getMutableAgentState.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates( prevState.agentStates )
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
 
+        self._copiedAgents = set()
         self._foodEaten = None
         self._foodAdded = None
         self._capsuleEaten = None
@@ -395,6 +735,8 @@ class GameStateData:
     def deepCopy( self ):
         state = GameStateData( self )
         state.food = self.food.deepCopy()
+        state.capsules = self.capsules[:]
+        state.agentStates = self.copyAgentStates( self.agentStates )
         state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
@@ -402,6 +744,16 @@ class GameStateData:
         state._capsuleEaten = self._capsuleEaten
         return state
 
+    def getMutableAgentState( self, index ):
+        """
+        Returns agentStates[index] for changing, copying it first if it is
+        still shared with the packet this one was generated from.
+        """
+        if index not in self._copiedAgents:
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._copiedAgents.add( index )
+        return self.agentStates[index]
+
     def copyAgentStates( self, agentStates ):
         copiedStates = []
         for agentState in agentStates:
@@ -432,6 +784,14 @@ class GameStateData:
                 #hash(state)
         return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113* hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575 )
 
+    def fingerprint( self ):
+        """
+        A hash of the packet for telling states apart without keeping them;
+        unlike __hash__ it is not reduced to 20 bits.  The score goes in as
+        a string because hash(-1) == hash(-2).
+        """
+        return hash( ( tuple( self.agentStates ), self.food, tuple( self.capsules ), repr( self.score ) ) )
+
     def __str__( self ):
         width, height = self.layout.width, self.layout.height
         map = Grid(width, height)
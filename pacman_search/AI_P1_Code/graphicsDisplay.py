@@ -580,6 +580,22 @@ class PacmanGraphics:
             if self.frameTime < 0:
                 refresh()
 
+    def addExpandedCells(self, cells):
+        """
+        Draws more expanded grid positions next to the ones already drawn, for
+        search agents that report expansions while they search
+        """
+        if 'expandedCells' not in dir(self):
+            self.expandedCells = []
+        cellColor = formatColor(.75, .25, .25)
+        for cell in cells:
+            block = square(self.to_screen(cell),
+                     0.5 * self.gridSize,
+                     color = cellColor,
+                     filled = 1, behind=2)
+            self.expandedCells.append(block)
+        refresh()
+
     def clearExpandedCells(self):
         if 'expandedCells' in dir(self) and len(self.expandedCells) > 0:
             for cell in self.expandedCells:
@@ -0,0 +1,222 @@
+# heuristicCheck.py
+# -----------------
+# Checks a heuristic against the true costs of a whole search problem.
+#
+# > python heuristicCheck.py -l trickySearch -p FoodSearchProblem -H foodHeuristic
+# > python heuristicCheck.py -l mediumCorners -p CornersProblem -H cornersHeuristic -w 4
+#
+# The reachable state space of the problem is enumerated once, the true cost
+# to the goal h* of every state comes from one backward Dijkstra search from
+# all the goal states, and the heuristic is evaluated on every state (or a
+# random sample of -n states and their successors) in -w worker processes.
+# The report lists states with h > h* (inadmissible) and edges with
+# h(s) > cost + h(s') (inconsistent), and the average of h / h* over the
+# checked states, the heuristic's tightness.  The exit status is 1 if
+# anything was violated.
+
+import heapq
+import optparse
+import os
+import random
+from array import array
+
+import layout
+import pacman
+import searchAgents
+import util
+from searchBenchmark import makeProblem
+
+# tolerance for floating point heuristics such as euclideanHeuristic
+EPSILON = 1e-9
+
+
+def exploreStateSpace(problem, maxStates):
+    """
+    Enumerates the states reachable from the start with a breadth-first
+    search.  Returns (states, edges, goals): states[i] is a state, edges[i]
+    the (j, action, cost) triples of its successors and goals the indices of
+    goal states.  Raises ValueError if there are more than maxStates states,
+    since h* is only exact on the whole space.
+    """
+    start = problem.getStartState()
+    states, index, edges, goals = [start], {start: 0}, [], []
+    i = 0
+    while i < len(states):
+        state = states[i]
+        if problem.isGoalState(state):
+            goals.append(i)
+        stateEdges = []
+        for successor, action, cost in problem.getSuccessors(state):
+            j = index.get(successor)
+            if j is None:
+                if len(states) >= maxStates:
+                    raise ValueError('more than %d reachable states' % maxStates)
+                j = index[successor] = len(states)
+                states.append(successor)
+            stateEdges.append((j, action, cost))
+        edges.append(stateEdges)
+        i += 1
+    return states, edges, goals
+
+
+def trueCosts(edges, goals):
+    """
+    Returns h* of every state as an array: the cost of its cheapest path to
+    any goal, found by one Dijkstra search from all goals over the reversed
+    edges.  States that cannot reach a goal get infinity.
+    """
+    predecessors = [[] for i in range(len(edges))]
+    for i, stateEdges in enumerate(edges):
+        for j, action, cost in stateEdges:
+            predecessors[j].append((i, cost))
+
+    costs = array('d', [float('inf')]) * len(edges)
+    fringe = []
+    for goal in goals:
+        costs[goal] = 0
+        fringe.append((0, goal))
+    while fringe:
+        cost, j = heapq.heappop(fringe)
+        if cost > costs[j]:
+            continue
+        for i, stepCost in predecessors[j]:
+            if cost + stepCost < costs[i]:
+                costs[i] = cost + stepCost
+                heapq.heappush(fringe, (cost + stepCost, i))
+    return costs
+
+
+def evaluateHeuristic(problem, heuristic, states, workers):
+    "Returns [heuristic(state, problem) for state in states], split across worker processes"
+    if workers <= 1 or len(states) < 2 * workers:
+        return [heuristic(state, problem) for state in states]
+
+    from multiprocessing import Pool
+    chunkSize = max(1, len(states) // (workers * 4))
+    chunks = [states[start:start + chunkSize] for start in range(0, len(states), chunkSize)]
+    pool = Pool(workers, _evaluateInit, (problem, heuristic))
+    try:
+        values = []
+        for chunkValues in pool.imap(_evaluateChunk, chunks):
+            values.extend(chunkValues)
+        return values
+    finally:
+        pool.terminate()
+        pool.join()
+
+# the problem and heuristic of a worker process (set by _evaluateInit)
+_WORKER = {}
+
+def _evaluateInit(problem, heuristic):
+    _WORKER['problem'] = problem
+    _WORKER['heuristic'] = heuristic
+
+def _evaluateChunk(states):
+    problem, heuristic = _WORKER['problem'], _WORKER['heuristic']
+    return [heuristic(state, problem) for state in states]
+
+
+def checkHeuristic(problem, heuristic, sample=None, workers=1, maxStates=200000, seed=0):
+    """
+    Checks heuristic on problem and returns a report dict:
+
+      states, goals:   size of the reachable state space and its goals
+      checked:         states whose admissibility was checked
+      checkedEdges:    edges whose consistency was checked
+      inadmissible:    (state, h, h*) for every checked state with h > h*
+      inconsistent:    (state, action, successor, h, cost, h') for every
+                       checked edge with h > cost + h'
+      negative:        states with h < 0
+      tightness:       average h / h* over checked states with 0 < h* < inf
+
+    sample limits the check to that many random states (and the edges out
+    of them); by default every state is checked.
+    """
+    states, edges, goals = exploreStateSpace(problem, maxStates)
+    hStar = trueCosts(edges, goals)
+
+    checked = list(range(len(states)))
+    if sample is not None and sample < len(states):
+        checked = sorted(random.Random(seed).sample(checked, sample))
+    needed = set(checked)
+    for i in checked:
+        needed.update(j for j, action, cost in edges[i])
+    needed = sorted(needed)
+    values = dict(zip(needed, evaluateHeuristic(problem, heuristic, [states[i] for i in needed], workers)))
+
+    report = {'states': len(states), 'goals': len(goals), 'checked': len(checked), 'checkedEdges': 0,
+              'inadmissible': [], 'inconsistent': [], 'negative': []}
+    ratios = []
+    for i in checked:
+        h = values[i]
+        if h < 0:
+            report['negative'].append(states[i])
+        if h > hStar[i] + EPSILON:
+            report['inadmissible'].append((states[i], h, hStar[i]))
+        elif 0 < hStar[i] < float('inf'):
+            ratios.append(h / hStar[i])
+        for j, action, cost in edges[i]:
+            report['checkedEdges'] += 1
+            if h > cost + values[j] + EPSILON:
+                report['inconsistent'].append((states[i], action, states[j], h, cost, values[j]))
+    report['tightness'] = sum(ratios) / len(ratios) if ratios else None
+    return report
+
+
+def describeState(problem, state):
+    "Returns state as (position, visited corners) for problems with packed states"
+    if problem is not None and hasattr(problem, 'getVisitedCorners'):
+        return (problem.getPosition(state), problem.getVisitedCorners(state))
+    return state
+
+
+def printReport(report, shown, problem=None):
+    print('%d reachable states, %d goals; checked %d states and %d edges' % (
+        report['states'], report['goals'], report['checked'], report['checkedEdges']))
+    if report['tightness'] is not None:
+        print('average h / h*: %.4f' % report['tightness'])
+    print('inadmissible states: %d' % len(report['inadmissible']))
+    for state, h, hStar in report['inadmissible'][:shown]:
+        print('  h = %s > h* = %s at %s' % (h, hStar, describeState(problem, state)))
+    print('inconsistent edges: %d' % len(report['inconsistent']))
+    for state, action, successor, h, cost, hNext in report['inconsistent'][:shown]:
+        print('  h = %s > %s + %s moving %s from %s' % (h, cost, hNext, action, describeState(problem, state)))
+    print('negative values: %d' % len(report['negative']))
+
+
+def parseOptions():
+    optParser = optparse.OptionParser()
+    optParser.add_option('-l', '--layout', action='store', dest='layout', default='mediumCorners',
+                         help='Layout to check on (default %default)')
+    optParser.add_option('-p', '--problem', action='store', dest='problem', default='CornersProblem',
+                         help='Search problem in searchAgents.py (default %default)')
+    optParser.add_option('-H', '--heuristic', action='store', dest='heuristic', default='cornersHeuristic',
+                         help='Heuristic in searchAgents.py (default %default)')
+    optParser.add_option('-n', '--sample', action='store', type='int', dest='sample', default=None,
+                         help='Check only this many random states (default: all)')
+    optParser.add_option('-w', '--workers', action='store', type='int', dest='workers', default=os.cpu_count() or 1,
+                         help='Processes evaluating the heuristic (default %default)')
+    optParser.add_option('--maxStates', action='store', type='int', dest='maxStates', default=200000,
+                         help='Largest state space to enumerate (default %default)')
+    optParser.add_option('--seed', action='store', type='int', dest='seed', default=0,
+                         help='Random seed for --sample (default %default)')
+    optParser.add_option('--show', action='store', type='int', dest='show', default=10,
+                         help='Violations of each kind to print (default %default)')
+    opts, args = optParser.parse_args()
+    return opts
+
+
+if __name__ == '__main__':
+    opts = parseOptions()
+    gameState = pacman.GameState()
+    gameState.initialize(layout.getLayout(opts.layout), 0)
+    problem = makeProblem(opts.problem, gameState)
+    heuristic = getattr(searchAgents, opts.heuristic)
+    util.mutePrint()
+    try:
+        report = checkHeuristic(problem, heuristic, opts.sample, opts.workers, opts.maxStates, opts.seed)
+    finally:
+        util.unmutePrint()
+    printReport(report, opts.show, problem)
+    if report['inadmissible'] or report['inconsistent'] or report['negative']:
+        raise SystemExit(1)
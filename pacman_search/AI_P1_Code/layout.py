@@ -36,6 +36,7 @@ class Layout:
         self.processLayoutText(layoutText)
         self.layoutText = layoutText
         self.totalFood = len(self.food.asList())
+        self.fileName = None # set by tryToLoad for layouts read from a .lay file
         # self.initializeVisibilityMatrix()
 
     def getNumGhosts(self):
@@ -91,7 +92,9 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        layout = Layout(self.layoutText[:])
+        layout.fileName = self.fileName
+        return layout
 
     def processLayoutText(self, layoutText):
         """
@@ -146,5 +149,8 @@ def getLayout(name, back = 2):
 def tryToLoad(fullname):
     if(not os.path.exists(fullname)): return None
     f = open(fullname)
-    try: return Layout([line.strip() for line in f])
+    try:
+        layout = Layout([line.strip() for line in f])
+        layout.fileName = os.path.abspath(fullname)
+        return layout
     finally: f.close()
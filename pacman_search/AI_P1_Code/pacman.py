@@ -40,9 +40,11 @@ To play your first game, type 'python pacman.py' from the command line.
 The keys are 'a', 's', 'd', and 'w' to move (or arrow keys).  Have fun!
 """
 from game import GameStateData
+from game import Configuration
 from game import Game
 from game import Directions
 from game import Actions
+from game import getLegalMoveTable
 from util import nearestPoint
 from util import manhattanDistance
 import util, layout
@@ -71,14 +73,54 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
-    explored = set()
+    # Instrumentation of generateSuccessor, off by default (see trackExplored).
+    # explored holds the states successors were generated from and to, or
+    # their fingerprints in 'count' mode; exploredCount counts the calls.
+    explored = None
+    exploredMode = None
+    exploredCount = 0
+    exploredLimit = None
+
+    def trackExplored( mode='states', limit=1 << 20 ):
+        """
+        Turns on recording of the states generateSuccessor is called on and
+        returns.  'states' keeps the states themselves in GameState.explored,
+        which keeps them all alive; 'count' only counts the calls in
+        GameState.exploredCount and keeps up to limit state fingerprints
+        (ints) in GameState.explored.  mode None turns recording off again.
+        """
+        if mode not in ('states', 'count', None):
+            raise ValueError('Unknown explored tracking mode: %s' % mode)
+        GameState.exploredMode = mode
+        GameState.exploredLimit = limit
+        GameState.explored = set() if mode is not None else None
+        GameState.exploredCount = 0
+    trackExplored = staticmethod(trackExplored)
+
     def getAndResetExplored():
-        tmp = GameState.explored.copy()
+        """
+        Returns the set recorded since the last call (see trackExplored) and
+        starts a new one.  Returns an empty set if recording is off.
+        """
+        tmp = GameState.explored
+        if tmp is None: return set()
         GameState.explored = set()
+        GameState.exploredCount = 0
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def _recordExplored( parent, child ):
+        explored = GameState.explored
+        if GameState.exploredMode == 'states':
+            explored.add(parent)
+            explored.add(child)
+            return
+        GameState.exploredCount += 1
+        if len(explored) < GameState.exploredLimit:
+            explored.add(parent.data.fingerprint())
+            explored.add(child.data.fingerprint())
+    _recordExplored = staticmethod(_recordExplored)
+
     def getLegalActions( self, agentIndex=0 ):
         """
         Returns the legal actions for the agent specified.
@@ -112,7 +154,7 @@ class GameState:
         if agentIndex == 0:
             state.data.scoreChange += -TIME_PENALTY # Penalty for waiting around
         else:
-            GhostRules.decrementTimer( state.data.agentStates[agentIndex] )
+            GhostRules.decrementTimer( state.data.getMutableAgentState( agentIndex ) )
 
         # Resolve multi-agent effects
         GhostRules.checkDeath( state, agentIndex )
@@ -120,8 +162,8 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.explored is not None:
+            GameState._recordExplored(self, state)
         return state
 
     def getLegalPacmanActions( self ):
@@ -331,7 +373,7 @@ class PacmanRules:
         """
         Returns a list of possible actions.
         """
-        return Actions.getPossibleActions( state.getPacmanState().configuration, state.data.layout.walls )
+        return Actions.getPossibleActions( state.data.agentStates[0].configuration, state.data.layout.walls )
     getLegalActions = staticmethod( getLegalActions )
 
     def applyAction( state, action ):
@@ -342,7 +384,7 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.getMutableAgentState( 0 )
 
         # Update Configuration
         vector = Actions.directionToVector( action, PacmanRules.PACMAN_SPEED )
@@ -371,11 +413,12 @@ class PacmanRules:
                 state.data._win = True
         # Eat capsule
         if( position in state.getCapsules() ):
+            state.data.capsules = state.data.capsules[:]
             state.data.capsules.remove( position )
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range( 1, len( state.data.agentStates ) ):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.getMutableAgentState( index ).scaredTimer = SCARED_TIME
     consume = staticmethod( consume )
 
 class GhostRules:
@@ -389,6 +432,8 @@ class GhostRules:
         reach a dead end, but can turn 90 degrees at intersections.
         """
         conf = state.getGhostState( ghostIndex ).configuration
+        moves = getLegalMoveTable( state.data.layout.walls ).ghostActions.get( conf.pos )
+        if moves is not None: return list( moves[conf.direction] )
         possibleActions = Actions.getPossibleActions( conf, state.data.layout.walls )
         reverse = Actions.reverseDirection( conf.direction )
         if Directions.STOP in possibleActions:
@@ -404,7 +449,7 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.getMutableAgentState( ghostIndex )
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0: speed /= 2.0
         vector = Actions.directionToVector( action, speed )
@@ -414,7 +459,8 @@ class GhostRules:
     def decrementTimer( ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint( ghostState.configuration.pos )
+            conf = ghostState.configuration
+            ghostState.configuration = Configuration( nearestPoint( conf.pos ), conf.direction )
         ghostState.scaredTimer = max( 0, timer - 1 )
     decrementTimer = staticmethod( decrementTimer )
 
@@ -435,6 +481,7 @@ class GhostRules:
 
     def collide( state, ghostState, agentIndex):
         if ghostState.scaredTimer > 0:
+            ghostState = state.data.getMutableAgentState( agentIndex )
             state.data.scoreChange += 200
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
@@ -523,6 +570,10 @@ def readCommand( argv ):
                       help='Turns on exception handling and timeouts during games', default=False)
     parser.add_option('--timeout', dest='timeout', type='int',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--searchStats', dest='searchStats', type='choice', choices=['json', 'text'],
+                      help='Print the performance counters of the search (json or text); search agents only', default=None)
+    parser.add_option('--bitGrids', action='store_true', dest='bitGrids',
+                      help='Store food and walls in int-backed grids (game.BitGrid)', default=False)
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -532,6 +583,10 @@ def readCommand( argv ):
     # Fix the random seed
     if options.fixRandomSeed: random.seed('cs188')
 
+    if options.bitGrids:
+        import game
+        game.useBitGrids()
+
     # Choose a layout
     args['layout'] = layout.getLayout( options.layout )
     if args['layout'] == None: raise Exception("The layout " + options.layout + " cannot be found")
@@ -543,6 +598,10 @@ def readCommand( argv ):
     if options.numTraining > 0:
         args['numTraining'] = options.numTraining
         if 'numTraining' not in agentOpts: agentOpts['numTraining'] = options.numTraining
+    if options.searchStats != None:
+        if 'searchStats' not in pacmanType.__init__.__code__.co_varnames:
+            raise Exception('The agent ' + options.pacman + ' does not report search statistics.')
+        agentOpts['searchStats'] = options.searchStats
     pacman = pacmanType(**agentOpts) # Instantiate Pacman with agentArgs
     args['pacman'] = pacman
 
@@ -95,119 +95,1156 @@ def depthFirstSearch(problem: SearchProblem) -> List[Directions]:
     # print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
     # print("Start's successors:", problem.getSuccessors(problem.getStartState()))
 
-    from util import Stack
-    # initialization
-    visited = set()
-    fringe = Stack()
-    startState = problem.getStartState()
-    fringe.push((startState, []))  
+    return SearchSession(problem, 'dfs').run()
 
-    # start searching :)
-    while not fringe.isEmpty():
-        state, actions = fringe.pop()
+def breadthFirstSearch(problem: SearchProblem) -> List[Directions]:
+    """Search the shallowest nodes in the search tree first."""
+    "*** YOUR CODE HERE ***"
+    return SearchSession(problem, 'bfs').run()
 
-        if problem.isGoalState(state):
-            return actions
+def uniformCostSearch(problem: SearchProblem, dedupe=False) -> List[Directions]:
+    """
+    Search the node of least total cost first.
 
-        if state not in visited:
-            visited.add(state)
-            successors = problem.getSuccessors(state)
-            for childState, direction, stepCost in successors:
-                newActions = actions + [direction]
-                fringe.push((childState, newActions))
+    With dedupe=True, successors that are no cheaper than the best path already
+    pushed for their state are dropped instead of pushed (see
+    _dedupedBestFirstSearch).
+    """
+    "*** YOUR CODE HERE ***"
+    if dedupe:
+        return _dedupedBestFirstSearch(problem, nullHeuristic)
 
-    print("This search doesn't have any answer!")
-    return []
+    return SearchSession(problem, 'ucs').run()
 
-def breadthFirstSearch(problem: SearchProblem) -> List[Directions]:
-    """Search the shallowest nodes in the search tree first."""
+def nullHeuristic(state, problem=None) -> float:
+    """
+    A heuristic function estimates the cost from the current state to the nearest
+    goal in the provided SearchProblem.  This heuristic is trivial.
+    """
+    return 0
+
+class SearchSession:
+    """
+    The graph search behind depthFirstSearch, breadthFirstSearch,
+    uniformCostSearch and aStarSearch, kept in an object so that it can be
+    run a few expansions at a time, pickled between steps (for example when
+    a worker is preempted) and resumed in another process with the same
+    result as an uninterrupted run.
+
+      session = SearchSession(problem, 'astar', heuristic)
+      while not session.step(1000):
+          session.save('search.ckpt')
+      path = session.path
+
+    strategy is 'dfs', 'bfs', 'ucs' or 'astar'.  The session holds the
+    problem, the heuristic, the fringe, the visited set and a
+    util.SearchNodeStore; pickling one needs a picklable problem and
+    heuristic (module-level functions are).  Counters: expanded (states
+    expanded by this session) and fringeHighWater, which is also recorded on
+    the problem as _fringeHighWater.
+    """
+    STRATEGIES = ['dfs', 'bfs', 'ucs', 'astar']
+
+    def __init__(self, problem: SearchProblem, strategy='astar', heuristic=nullHeuristic):
+        if strategy not in self.STRATEGIES:
+            raise ValueError('unknown search strategy: %s' % strategy)
+        self.problem = problem
+        self.strategy = strategy
+        self.heuristic = heuristic if strategy == 'astar' else nullHeuristic
+        self.visited = set()
+        self.nodes = util.SearchNodeStore()
+        self.expanded = 0
+        self.fringeHighWater = 0
+        self.path = None
+        self.finished = False
+
+        startState = problem.getStartState()
+        if strategy == 'dfs':
+            self.fringe = util.Stack()
+        elif strategy == 'bfs':
+            self.fringe = util.Queue()
+        else:
+            self.fringe = util.PriorityQueue()
+        self._push((startState, self.nodes.ROOT, None, 0), 0)
+
+    def _push(self, entry, cost):
+        if self.strategy in ('dfs', 'bfs'):
+            self.fringe.push(entry)
+        else:
+            self.fringe.push(entry, cost + self.heuristic(entry[0], self.problem))
+
+    def step(self, expansions=None):
+        """
+        Runs the search until it finishes or has expanded 'expansions' more
+        states (all the way if None).  Returns whether it has finished; the
+        path is then in self.path ([] if there is no answer).
+        """
+        problem, nodes, visited, fringe = self.problem, self.nodes, self.visited, self.fringe
+        push = self._push
+        entries = fringe.heap if self.strategy in ('ucs', 'astar') else fringe.list
+        limit = None if expansions is None else self.expanded + expansions
+
+        while not self.finished and not fringe.isEmpty():
+            if limit is not None and self.expanded >= limit:
+                return False
+            state, parent, action, stepCost = fringe.pop()
+
+            if problem.isGoalState(state):
+                self.path = nodes.getPath(parent, action)
+                self.finished = True
+                break
+
+            if state not in visited:
+                visited.add(state)
+                node = nodes.addNode(state, parent, action, stepCost)
+                self.expanded += 1
+                cost = nodes.getCost(node)
+                for childState, direction, childCost in problem.getSuccessors(state):
+                    push((childState, node, direction, childCost), cost + childCost)
+                if len(entries) > self.fringeHighWater:
+                    self.fringeHighWater = len(entries)
+                if self.fringeHighWater > getattr(problem, '_fringeHighWater', 0):
+                    problem._fringeHighWater = self.fringeHighWater
+
+        if not self.finished:
+            print("This search doesn't have any answer!")
+            self.path = []
+            self.finished = True
+        return True
+
+    def run(self) -> List[Directions]:
+        "Runs the search to the end and returns the path"
+        self.step()
+        return self.path
+
+    def expansions(self, batchSize=100):
+        """
+        Runs the search batchSize expansions at a time, yielding the list of
+        states expanded in each batch, in expansion order.  Returns the path
+        when the search finishes (path = yield from session.expansions()).
+        """
+        while True:
+            start = len(self.nodes)
+            finished = self.step(batchSize)
+            if len(self.nodes) > start:
+                yield self.nodes.states[start:]
+            if finished:
+                return self.path
+
+    def __getstate__(self):
+        """
+        Pickles the node store and the fringe column by column (states in one
+        list, parents, costs and priorities in arrays, actions as small
+        integer codes) instead of as one tuple per node and fringe entry.  The
+        visited set is not stored: it holds exactly the node store's states.
+        """
+        from array import array
+        state = self.__dict__.copy()
+        nodes, fringe = state.pop('nodes'), state.pop('fringe')
+        prioritized = self.strategy in ('ucs', 'astar')
+        entries = [entry[2] for entry in fringe.heap] if prioritized else fringe.list
+
+        codes = {}
+        def encode(actions):
+            actions = [codes.setdefault(action, len(codes)) for action in actions]
+            return array('B' if len(codes) <= 256 else 'L', actions)
+        del state['visited'] # the states of the node store
+        state['nodeStates'] = nodes.states
+        state['nodeActions'] = encode(nodes.actions)
+        state['nodeParents'] = nodes.parents
+        state['nodeCosts'] = nodes.costs
+        state['fringeStates'] = [entry[0] for entry in entries]
+        state['fringeParents'] = array('l', [entry[1] for entry in entries])
+        state['fringeActions'] = encode([entry[2] for entry in entries])
+        state['fringeStepCosts'] = array('d', [entry[3] for entry in entries])
+        if prioritized:
+            state['fringePriorities'] = array('d', [entry[0] for entry in fringe.heap])
+            state['fringeCounts'] = array('q', [entry[1] for entry in fringe.heap])
+            state['fringeCount'] = fringe.count
+        state['actionNames'] = list(codes)
+        return state
+
+    def __setstate__(self, state):
+        names = state.pop('actionNames')
+        nodes = util.SearchNodeStore()
+        nodes.states = state.pop('nodeStates')
+        nodes.actions = [names[code] for code in state.pop('nodeActions')]
+        nodes.parents = state.pop('nodeParents')
+        nodes.costs = state.pop('nodeCosts')
+        entries = list(zip(state.pop('fringeStates'), state.pop('fringeParents'),
+                           [names[code] for code in state.pop('fringeActions')], state.pop('fringeStepCosts')))
+        if state['strategy'] in ('ucs', 'astar'):
+            fringe = util.PriorityQueue()
+            fringe.heap = list(zip(state.pop('fringePriorities'), state.pop('fringeCounts'), entries))
+            fringe.count = state.pop('fringeCount')
+        else:
+            fringe = util.Stack() if state['strategy'] == 'dfs' else util.Queue()
+            fringe.list = entries
+        self.__dict__.update(state)
+        self.visited = set(nodes.states)
+        self.nodes = nodes
+        self.fringe = fringe
+
+    def save(self, fileName):
+        """
+        Pickles the session to fileName.  The file is written under a
+        temporary name first, so an interrupted save leaves the previous
+        checkpoint intact.
+        """
+        import os, pickle
+        temporary = '%s.%d.tmp' % (fileName, os.getpid())
+        with open(temporary, 'wb') as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, fileName)
+
+    @staticmethod
+    def load(fileName):
+        "Returns the session saved in fileName"
+        import pickle
+        with open(fileName, 'rb') as f:
+            return pickle.load(f)
+
+def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic, dedupe=False) -> List[Directions]:
+    """
+    Search the node that has the lowest combined cost and heuristic first.
+
+    With dedupe=True, successors that are no cheaper than the best path already
+    pushed for their state are dropped instead of pushed (see
+    _dedupedBestFirstSearch).
+    """
     "*** YOUR CODE HERE ***"
-    from util import Queue
+    if dedupe:
+        return _dedupedBestFirstSearch(problem, heuristic)
+
+    return SearchSession(problem, 'astar', heuristic).run()
+
+def _dedupedBestFirstSearch(problem: SearchProblem, heuristic) -> List[Directions]:
+    """
+    Best-first search on g + h that keeps the best known path cost g of every
+    state and refuses to push a successor whose cost does not improve on it.
+    An entry that was superseded by a cheaper push after it entered the fringe
+    is skipped when popped, so the fringe holds at most one live entry per
+    state.
+
+    A state is expanded again only if a strictly cheaper path to it shows up,
+    which happens only for inconsistent heuristics.  With consistent heuristics
+    the expansion order, the path and _expanded match aStarSearch.
+
+    The fringe high-water mark and the number of pushes avoided are recorded
+    on the problem as _fringeHighWater and _pushesAvoided.
+    """
+    from util import PriorityQueue
     # initialization
-    visited = set()
-    fringe = Queue()
+    bestCost = {}
+    nodes = util.SearchNodeStore()
+    fringe = PriorityQueue()
     startState = problem.getStartState()
-    fringe.push((startState, []))  
+    bestCost[startState] = 0
+    fringe.push((startState, nodes.ROOT, None, 0), heuristic(startState, problem))
+    problem._fringeHighWater = max(getattr(problem, '_fringeHighWater', 0), 1)
+    problem._pushesAvoided = getattr(problem, '_pushesAvoided', 0)
 
     # start searching :)
     while not fringe.isEmpty():
-        state, actions = fringe.pop()
+        state, parent, action, stepCost = fringe.pop()
+        cost = nodes.getCost(parent) + stepCost
+        if cost > bestCost[state]:
+            continue
 
         if problem.isGoalState(state):
-            return actions
+            return nodes.getPath(parent, action)
 
-        if state not in visited:
-            visited.add(state)
-            successors = problem.getSuccessors(state)
-            for childState, direction, stepCost in successors:
-                newActions = actions + [direction]
-                fringe.push((childState, newActions))
+        node = nodes.addNode(state, parent, action, stepCost)
+        for childState, direction, childCost in problem.getSuccessors(state):
+            newCost = cost + childCost
+            if childState in bestCost and bestCost[childState] <= newCost:
+                problem._pushesAvoided += 1
+                continue
+            bestCost[childState] = newCost
+            fringe.push((childState, node, direction, childCost), newCost + heuristic(childState, problem))
+        highWater = len(fringe.heap)
+        if highWater > problem._fringeHighWater:
+            problem._fringeHighWater = highWater
 
     print("This search doesn't have any answer!")
     return []
 
-def uniformCostSearch(problem: SearchProblem) -> List[Directions]:
-    """Search the node of least total cost first."""
-    "*** YOUR CODE HERE ***"
+def anytimeRepairingAStar(problem: SearchProblem, heuristic=nullHeuristic, weight=3.0, weightStep=0.5, deadline=None):
+    """
+    Anytime repairing A* (ARA*) as a generator.  The first pass is a
+    weighted A* on g + weight * h, which finds a path quickly; every later
+    pass lowers the weight by weightStep (down to 1) and repairs the previous
+    search instead of starting over: states whose cost improved after they
+    were expanded are kept aside and put back on the fringe for the next
+    pass, and nothing else is expanded again.
+
+    Yields (path, bound) after every pass that found a cheaper path than the
+    last one yielded, where bound is an upper bound on the path cost divided
+    by the optimal cost.  The last pass, with weight 1, always yields, with
+    bound 1.0, even if its path is no cheaper.  With a deadline (a time.time() value) the generator
+    stops once it is past the deadline, but never before the first path.
+    The heuristic should be consistent for the bounds to hold.
+    """
+    import time
     from util import PriorityQueue
     # initialization
-    visited = set()
+    startState = problem.getStartState()
+    g = {startState: 0}
+    h = {startState: heuristic(startState, problem)}
+    parents = {startState: None}
+    closed = set()
+    inconsistent = set()
     fringe = PriorityQueue()
+    fringe.push((startState, 0), weight * h[startState])
+    goal = None
+    bestYielded = float('inf')
+    problem._fringeHighWater = max(getattr(problem, '_fringeHighWater', 0), 1)
+
+    while True:
+        # improve the path with the current weight
+        while not fringe.isEmpty() and (goal is None or g[goal] > fringe.heap[0][0]):
+            if goal is not None and deadline is not None and time.time() > deadline:
+                return
+            state, cost = fringe.pop()
+            if state in closed or cost != g[state]:
+                continue
+            closed.add(state)
+            if problem.isGoalState(state):
+                if goal is None or cost < g[goal]:
+                    goal = state
+                continue
+            for childState, direction, childCost in problem.getSuccessors(state):
+                newCost = cost + childCost
+                if childState in g and g[childState] <= newCost:
+                    continue
+                g[childState] = newCost
+                parents[childState] = (state, direction)
+                if childState not in h:
+                    h[childState] = heuristic(childState, problem)
+                if childState in closed:
+                    inconsistent.add(childState)
+                else:
+                    fringe.push((childState, newCost), newCost + weight * h[childState])
+            highWater = len(fringe.heap)
+            if highWater > problem._fringeHighWater:
+                problem._fringeHighWater = highWater
+
+        if goal is None:
+            print("This search doesn't have any answer!")
+            return
+
+        # the states that could still lead to a cheaper path
+        openStates = set(state for (state, cost) in (entry[2] for entry in fringe.heap)
+                         if cost == g[state] and state not in closed)
+        openStates |= inconsistent
+        lowest = min([g[state] + h[state] for state in openStates] or [g[goal]])
+        bound = weight if lowest <= 0 else min(weight, g[goal] / lowest)
+        path = []
+        state = goal
+        while parents[state] is not None:
+            state, action = parents[state]
+            path.append(action)
+        path.reverse()
+        final = weight <= 1 or not openStates
+        if final or g[goal] < bestYielded:
+            bestYielded = g[goal]
+            yield path, max(bound, 1.0)
+        if final:
+            return
+
+        # lower the weight and put every open state back on the fringe
+        weight = max(1.0, weight - weightStep)
+        fringe = PriorityQueue()
+        for state in openStates:
+            fringe.push((state, g[state]), g[state] + weight * h[state])
+        closed = set()
+        inconsistent = set()
+
+def anytimeRepairingAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, weight=3.0, weightStep=0.5, timeBudget=None) -> List[Directions]:
+    """
+    Runs anytimeRepairingAStar and returns the best path it found, either
+    after the optimal pass or, with a timeBudget in seconds, when the budget
+    runs out (the first path is always completed).  The suboptimality bound
+    of the returned path is recorded on the problem as _suboptimalityBound.
+    """
+    import time
+    deadline = None if timeBudget is None else time.time() + timeBudget
+    path = []
+    for path, bound in anytimeRepairingAStar(problem, heuristic, weight, weightStep, deadline):
+        problem._suboptimalityBound = bound
+    return path
+
+def iterativeDeepeningAStarSearch(problem: SearchProblem, heuristic=nullHeuristic) -> List[Directions]:
+    """
+    Depth-first searches with a growing bound on f = g + h.  Each iteration
+    explores every path whose f stays within the bound; the next bound is
+    the smallest f that went over it.  Only the current path and one
+    successor list per step are kept in memory, so memory grows with the
+    solution length instead of with the number of states, at the price of
+    re-expanding states across iterations.  With an admissible heuristic the
+    first path found is optimal.
+
+    States already on the current path are not revisited, but the same state
+    may be reached again along different paths; _expanded counts every
+    expansion.
+    """
     startState = problem.getStartState()
-    fringe.push((startState, [], 0), 0)
+    if problem.isGoalState(startState):
+        return []
+    bound = heuristic(startState, problem)
+
+    while True:
+        nextBound = float('inf')
+        onPath = {startState}
+        states, actions, costs = [startState], [], [0]
+        stack = [iter(problem.getSuccessors(startState))]
+
+        while stack:
+            successor = next(stack[-1], None)
+            if successor is None:
+                stack.pop()
+                onPath.remove(states.pop())
+                costs.pop()
+                if actions:
+                    actions.pop()
+                continue
+
+            childState, direction, stepCost = successor
+            if childState in onPath:
+                continue
+            cost = costs[-1] + stepCost
+            f = cost + heuristic(childState, problem)
+            if f > bound:
+                nextBound = min(nextBound, f)
+                continue
+            if problem.isGoalState(childState):
+                return actions + [direction]
+
+            onPath.add(childState)
+            states.append(childState)
+            actions.append(direction)
+            costs.append(cost)
+            stack.append(iter(problem.getSuccessors(childState)))
+            if len(stack) > getattr(problem, '_fringeHighWater', 0):
+                problem._fringeHighWater = len(stack)
+
+        if nextBound == float('inf'):
+            print("This search doesn't have any answer!")
+            return []
+        bound = nextBound
+
+def jumpPointSearch(problem: SearchProblem, heuristic=nullHeuristic) -> List[Directions]:
+    """
+    Jump Point Search for 4-connected grids where every move costs 1, such
+    as PositionSearchProblem and AnyFoodSearchProblem.  Instead of expanding
+    every cell, the search jumps in a straight line until it reaches a cell
+    where the path may have to turn, and only expands those jump points:
+
+      - moving east or west, a cell is a jump point if a north or south
+        neighbour is open while the cell behind that neighbour is a wall;
+      - moving north or south, a cell is a jump point if a jump east or west
+        from it reaches a jump point;
+      - a goal cell is always a jump point.
+
+    Jump points reached moving horizontally go on straight and turn only
+    where forced; jump points reached moving vertically go on straight or
+    branch east and west.  Jump points are searched best-first on g + h, so
+    with an admissible heuristic the path is as short as the one A* finds.
+
+    The problem must have a 'walls' Grid.  Goals are the cell 'goal' if the
+    problem has one, otherwise the True cells of its 'food' Grid, otherwise
+    whatever isGoalState accepts.  _expanded counts expanded jump points.
+    """
+    from util import PriorityQueue
+    walls = problem.walls
+    if hasattr(problem, 'goal'):
+        goal = problem.goal
+        isGoal = lambda x, y: (x, y) == goal
+    elif hasattr(problem, 'food'):
+        food = problem.food
+        isGoal = lambda x, y: food[x][y]
+    else:
+        isGoal = lambda x, y: problem.isGoalState((x, y))
+
+    def jumpHorizontal(x, y, dx):
+        while True:
+            x += dx
+            if walls[x][y]:
+                return None
+            if isGoal(x, y):
+                return x, y
+            if (not walls[x][y + 1] and walls[x - dx][y + 1]) or (not walls[x][y - 1] and walls[x - dx][y - 1]):
+                return x, y
+
+    def jumpVertical(x, y, dy):
+        while True:
+            y += dy
+            if walls[x][y]:
+                return None
+            if isGoal(x, y) or jumpHorizontal(x, y, 1) is not None or jumpHorizontal(x, y, -1) is not None:
+                return x, y
+
+    directions = {(0, 1): Directions.NORTH, (0, -1): Directions.SOUTH,
+                  (1, 0): Directions.EAST, (-1, 0): Directions.WEST}
+
+    startState = problem.getStartState()
+    bestCost = {startState: 0}
+    parents = {startState: None}
+    fringe = PriorityQueue()
+    fringe.push((startState, 0, None), heuristic(startState, problem))
 
-    # start searching :)
     while not fringe.isEmpty():
-        state, actions, cost = fringe.pop()
+        state, cost, heading = fringe.pop()
+        if cost > bestCost[state]:
+            continue
+        x, y = state
+        if isGoal(x, y) and problem.isGoalState(state):
+            return _jumpPath(parents, state, directions)
 
-        if problem.isGoalState(state):
-            return actions
+        problem._expanded = getattr(problem, '_expanded', 0) + 1
+        if getattr(problem, 'trackVisited', True) and hasattr(problem, '_visitedlist'):
+            problem._visitedlist.append(state)
+        if heading is None:
+            headings = list(directions)
+        elif heading[1] == 0:
+            dx = heading[0]
+            headings = [heading]
+            for dy in (1, -1):
+                if not walls[x][y + dy] and walls[x - dx][y + dy]:
+                    headings.append((0, dy))
+        else:
+            headings = [heading, (1, 0), (-1, 0)]
 
-        if state not in visited:
-            visited.add(state)
-            for childState, direction, childCost in problem.getSuccessors(state):
-                newAction = actions + [direction]
-                newCost = cost + childCost
-                fringe.push((childState, newAction, newCost), newCost)
+        for dx, dy in headings:
+            if dy == 0:
+                jumpPoint = jumpHorizontal(x, y, dx)
+            else:
+                jumpPoint = jumpVertical(x, y, dy)
+            if jumpPoint is None:
+                continue
+            newCost = cost + abs(jumpPoint[0] - x) + abs(jumpPoint[1] - y)
+            if jumpPoint in bestCost and bestCost[jumpPoint] <= newCost:
+                continue
+            bestCost[jumpPoint] = newCost
+            parents[jumpPoint] = state
+            fringe.push((jumpPoint, newCost, (dx, dy)), newCost + heuristic(jumpPoint, problem))
 
     print("This search doesn't have any answer!")
     return []
 
-def nullHeuristic(state, problem=None) -> float:
+def _jumpPath(parents, state, directions) -> List[Directions]:
+    "Expands the straight segments between jump points into single moves"
+    path = []
+    while parents[state] is not None:
+        parent = parents[state]
+        dx, dy = state[0] - parent[0], state[1] - parent[1]
+        steps = abs(dx) + abs(dy)
+        path.extend([directions[(dx // steps, dy // steps)]] * steps)
+        state = parent
+    path.reverse()
+    return path
+
+class _BoundedNode:
+    "A search tree node of simplifiedMemoryBoundedAStarSearch."
+    __slots__ = ('key', 'state', 'parent', 'action', 'cost', 'depth', 'f', 'children', 'forgotten', 'version')
+
+    def __init__(self, key, state, parent, action, cost, f):
+        self.key = key            # refers to the node from its fringe entries
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.f = f
+        self.children = None      # None until expanded, then the children in memory
+        self.forgotten = None     # smallest f among the children dropped from memory
+        self.version = 0          # bumped whenever the node's fringe entries go stale
+
+    def getPath(self):
+        path = []
+        node = self
+        while node.parent is not None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
+def simplifiedMemoryBoundedAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, nodeBudget=10000) -> List[Directions]:
     """
-    A heuristic function estimates the cost from the current state to the nearest
-    goal in the provided SearchProblem.  This heuristic is trivial.
+    A* that never holds more than nodeBudget search nodes.  Before a node is
+    expanded, the leaves with the highest f (the shallowest ones on ties) are
+    dropped until its successors fit; a dropped leaf's f is remembered by its
+    parent, which is put back on the fringe so the dropped branch can be
+    regenerated if it becomes the best option again.  Successors that still
+    do not fit are remembered the same way.  The f of an expanded node is
+    backed up to the smallest f of its children, so the fringe always points
+    at the most promising branch still worth exploring.
+
+    Paths longer than nodeBudget - 1 moves cannot be held and get f = inf.
+    With an admissible heuristic the path returned is optimal among the
+    paths that fit in the budget; if none fits, [] is returned.
+
+    Fringe entries refer to nodes by key rather than holding them, so a
+    dropped node is freed at once; stale entries are skipped when popped and
+    the heaps are compacted once most of their entries are stale.  The peak
+    number of nodes held, at most nodeBudget, is recorded on the problem as
+    _nodeHighWater.
     """
-    return 0
+    import heapq, itertools
+    infinity = float('inf')
+    keys = itertools.count()
+    startState = problem.getStartState()
+    root = _BoundedNode(next(keys), startState, None, None, 0, heuristic(startState, problem))
+    # the nodes held, by key
+    tree = {root.key: root}
+    # the cheapest node held for each state; a successor that is no cheaper
+    # than it is not generated again
+    holding = {root.state: root}
+    problem._nodeHighWater = max(getattr(problem, '_nodeHighWater', 0), len(tree))
 
-def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic) -> List[Directions]:
-    """Search the node that has the lowest combined cost and heuristic first."""
-    "*** YOUR CODE HERE ***"
+    # both heaps hold (key..., count, version, node key); an entry is live
+    # while its node is held and the node's version matches it.  best pops the
+    # lowest f and deepest node first, worst the highest f and shallowest one.
+    best, worst = [], []
+    counter = itertools.count()
+    def pushFringe(node, f):
+        node.version += 1
+        count = next(counter)
+        heapq.heappush(best, (f, -node.depth, count, node.version, node.key))
+        heapq.heappush(worst, (-f, node.depth, count, node.version, node.key))
+    def liveNode(entry):
+        node = tree.get(entry[-1])
+        return node if node is not None and node.version == entry[3] else None
+    def makeRoom(needed, expanding):
+        # drop the worst leaves, other than the node being expanded, until
+        # needed more nodes fit in the budget
+        keep = []
+        while len(tree) + needed > nodeBudget and worst:
+            entry = heapq.heappop(worst)
+            leaf = liveNode(entry)
+            if leaf is None:
+                continue
+            if leaf.children or leaf.parent is None or leaf is expanding:
+                keep.append(entry)
+                continue
+            del tree[leaf.key]
+            parent = leaf.parent
+            parent.children.remove(leaf)
+            if holding.get(leaf.state) is leaf:
+                del holding[leaf.state]
+            if parent.forgotten is None or leaf.f < parent.forgotten:
+                parent.forgotten = leaf.f
+            pushFringe(parent, parent.forgotten)
+        for entry in keep:
+            heapq.heappush(worst, entry)
+    def backUp(node):
+        while node is not None and node.children is not None:
+            values = [child.f for child in node.children]
+            if node.forgotten is not None:
+                values.append(node.forgotten)
+            newF = min(values) if values else infinity
+            if newF == node.f:
+                return
+            node.f = newF
+            node = node.parent
+    pushFringe(root, root.f)
+
+    while best:
+        f, _, _, version, key = heapq.heappop(best)
+        node = tree.get(key)
+        if node is None or version != node.version:
+            continue
+        node.version += 1
+        if f == infinity:
+            break
+        if problem.isGoalState(node.state):
+            return node.getPath()
+
+        # expand the node, or regenerate the children it forgot
+        ancestors = set()
+        ancestor = node.parent
+        while ancestor is not None:
+            ancestors.add(ancestor.state)
+            ancestor = ancestor.parent
+        if node.children is None:
+            node.children = []
+        inMemory = set(child.state for child in node.children)
+        node.forgotten = None
+        successors = []
+        for childState, direction, stepCost in problem.getSuccessors(node.state):
+            if childState in ancestors or childState in inMemory:
+                continue
+            cost = node.cost + stepCost
+            if childState in holding and holding[childState].cost <= cost:
+                continue
+            depth = node.depth + 1
+            if depth >= nodeBudget or (depth == nodeBudget - 1 and not problem.isGoalState(childState)):
+                childF = infinity
+            else:
+                childF = max(node.f, cost + heuristic(childState, problem))
+            successors.append((childF, childState, direction, cost))
+        makeRoom(len(successors), node)
+        room = nodeBudget - len(tree)
+        if room < len(successors):
+            # keep the most promising successors and forget the rest
+            successors.sort(key=lambda successor: successor[0])
+            if node.forgotten is None or successors[room][0] < node.forgotten:
+                node.forgotten = successors[room][0]
+        for childF, childState, direction, cost in successors[:room]:
+            child = _BoundedNode(next(keys), childState, node, direction, cost, childF)
+            tree[child.key] = child
+            node.children.append(child)
+            holding[childState] = child
+            pushFringe(child, childF)
+        backUp(node)
+        if node.forgotten is not None:
+            pushFringe(node, node.forgotten)
+        elif not node.children:
+            # a dead end stays on the fringe, behind every finite f, only so
+            # that it can be dropped like any other leaf
+            pushFringe(node, infinity)
+
+        if len(best) + len(worst) > 4 * len(tree) + 64:
+            for heap in (best, worst):
+                heap[:] = [entry for entry in heap if liveNode(entry) is not None]
+                heapq.heapify(heap)
+        if len(tree) > problem._nodeHighWater:
+            problem._nodeHighWater = len(tree)
+
+    print("This search doesn't have any answer within %d nodes!" % nodeBudget)
+    return []
+
+class ReversedSearchProblem(SearchProblem):
+    """
+    A view of a single-goal search problem with the direction of every move
+    flipped: it starts at the goal, its successors are the predecessors of the
+    original problem and its goal is the original start state.
+
+    'goal' is set to the original start state, so heuristics that measure the
+    distance to problem.goal (such as manhattanHeuristic) estimate the
+    distance back to the start.  Any other attribute (walls, costFn, ...) is
+    read from the wrapped problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+    def getStartState(self):
+        return self.problem.getGoalState()
+
+    def getGoalState(self):
+        return self.goal
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        return self.problem.getPredecessors(state)
+
+    def getPredecessors(self, state):
+        return self.problem.getSuccessors(state)
+
+def _bidirectionalPath(forwardParents, backwardParents, meet) -> List[Directions]:
+    """
+    Joins the forward path from the start to 'meet' with the backward path from
+    'meet' to the goal.  forwardParents maps a state to (parent, action) with
+    'action' leading from the parent to it, backwardParents maps a state to
+    (next, action) with 'action' leading from it to the next state towards the
+    goal; the start and the goal map to None.
+    """
+    path = []
+    state = meet
+    while forwardParents[state] is not None:
+        state, action = forwardParents[state]
+        path.append(action)
+    path.reverse()
+    state = meet
+    while backwardParents[state] is not None:
+        state, action = backwardParents[state]
+        path.append(action)
+    return path
+
+def bidirectionalSearch(problem: SearchProblem) -> List[Directions]:
+    """
+    Breadth-first search from the start and from the goal at the same time,
+    one whole layer at a time, always growing the side with the smaller
+    layer.  The search stops after the first layer that reaches a state the
+    other side has already seen, so each side explores about half the depth
+    of a plain BFS.  Like breadthFirstSearch it returns a path with the
+    fewest moves.
+
+    The problem must have a single goal and provide getGoalState and
+    getPredecessors (see PositionSearchProblem).
+    """
+    startState = problem.getStartState()
+    if problem.isGoalState(startState):
+        return []
+    goalState = problem.getGoalState()
+
+    forwardParents = {startState: None}
+    backwardParents = {goalState: None}
+    forwardDepth = {startState: 0}
+    backwardDepth = {goalState: 0}
+    forwardLayer = [startState]
+    backwardLayer = [goalState]
+
+    while forwardLayer and backwardLayer:
+        if len(forwardLayer) <= len(backwardLayer):
+            forwardLayer, meet = _expandLayer(forwardLayer, problem.getSuccessors,
+                                              forwardParents, forwardDepth, backwardDepth)
+        else:
+            backwardLayer, meet = _expandLayer(backwardLayer, problem.getPredecessors,
+                                               backwardParents, backwardDepth, forwardDepth)
+        highWater = len(forwardLayer) + len(backwardLayer)
+        if highWater > getattr(problem, '_fringeHighWater', 0):
+            problem._fringeHighWater = highWater
+        if meet is not None:
+            problem.isGoalState(goalState) # lets the problem draw the expanded cells
+            return _bidirectionalPath(forwardParents, backwardParents, meet)
+
+    print("This search doesn't have any answer!")
+    return []
+
+def _expandLayer(layer, expand, parents, depth, otherDepth):
+    """
+    Expands every state of one BFS layer with 'expand' and returns the next
+    layer, together with the newly reached state that the other side reached
+    in the fewest moves (or None if the two sides have not met yet).  The
+    whole layer is expanded before returning so that the meeting state with
+    the shortest combined path is found.
+    """
+    nextLayer = []
+    meet = None
+    for state in layer:
+        childDepth = depth[state] + 1
+        for childState, direction, _ in expand(state):
+            if childState in depth:
+                continue
+            parents[childState] = (state, direction)
+            depth[childState] = childDepth
+            nextLayer.append(childState)
+            if childState in otherDepth and (meet is None or otherDepth[childState] < otherDepth[meet]):
+                meet = childState
+    return nextLayer, meet
+
+def bidirectionalAStarSearch(problem: SearchProblem, heuristic=nullHeuristic) -> List[Directions]:
+    """
+    Front-to-end bidirectional A*: one A* runs forwards from the start with
+    heuristic(state, problem) and another runs backwards from the goal with
+    heuristic(state, ReversedSearchProblem(problem)), i.e. the same heuristic
+    aimed at the start.  The side with the smaller fringe is expanded next.
+
+    Whenever one side generates a state the other side has a path to, the
+    joined path becomes a candidate of cost mu.  The search stops once the
+    smallest f = g + h on either fringe is at least mu: with an admissible
+    heuristic no unexpanded path can then be cheaper, so the returned path is
+    optimal.  As in _dedupedBestFirstSearch each side keeps the best g of
+    every state and skips stale fringe entries.
+
+    The problem must have a single goal and provide getGoalState and
+    getPredecessors (see PositionSearchProblem).  The combined fringe
+    high-water mark is recorded on the problem as _fringeHighWater.
+    """
     from util import PriorityQueue
-    # initialization
-    visited = set()
-    fringe = PriorityQueue()
     startState = problem.getStartState()
-    fringe.push((startState, [], 0), heuristic(startState, problem))
+    if problem.isGoalState(startState):
+        return []
+    goalState = problem.getGoalState()
+    reverse = ReversedSearchProblem(problem)
 
-    # start searching :)
-    while not fringe.isEmpty():
-        state, actions, cost = fringe.pop()
+    # index 0 is the forward search from the start, 1 the backward one from the goal
+    expanders = [problem.getSuccessors, problem.getPredecessors]
+    heuristics = [lambda state: heuristic(state, problem), lambda state: heuristic(state, reverse)]
+    costs = [{startState: 0}, {goalState: 0}]
+    parents = [{startState: None}, {goalState: None}]
+    fringes = [PriorityQueue(), PriorityQueue()]
+    fringes[0].push((startState, 0), heuristics[0](startState))
+    fringes[1].push((goalState, 0), heuristics[1](goalState))
+    problem._fringeHighWater = max(getattr(problem, '_fringeHighWater', 0), 2)
 
-        if problem.isGoalState(state):
-            return actions
+    bestCost = float('inf')
+    meet = None
+    while not fringes[0].isEmpty() and not fringes[1].isEmpty():
+        # the top of a fringe bounds the cost of every path not yet found on that side
+        if max(fringes[0].heap[0][0], fringes[1].heap[0][0]) >= bestCost:
+            break
 
-        if state not in visited:
-            visited.add(state)
-            for childState, direction, childCost in problem.getSuccessors(state):
-                newAction = actions + [direction]
-                newCost = cost + childCost
-                fringe.push((childState, newAction, newCost), newCost + heuristic(childState, problem))
+        side = 0 if len(fringes[0].heap) <= len(fringes[1].heap) else 1
+        cost, otherCost = costs[side], costs[1 - side]
+        state, g = fringes[side].pop()
+        if g > cost[state]:
+            continue
 
-    return []
+        for childState, direction, childCost in expanders[side](state):
+            newCost = g + childCost
+            if childState in cost and cost[childState] <= newCost:
+                continue
+            cost[childState] = newCost
+            parents[side][childState] = (state, direction)
+            fringes[side].push((childState, newCost), newCost + heuristics[side](childState))
+            if childState in otherCost and newCost + otherCost[childState] < bestCost:
+                bestCost = newCost + otherCost[childState]
+                meet = childState
+        highWater = len(fringes[0].heap) + len(fringes[1].heap)
+        if highWater > problem._fringeHighWater:
+            problem._fringeHighWater = highWater
+
+    if meet is None:
+        print("This search doesn't have any answer!")
+        return []
+    problem.isGoalState(goalState) # lets the problem draw the expanded cells
+    return _bidirectionalPath(parents[0], parents[1], meet)
+
+class SearchStats:
+    """
+    Performance counters of one search run, filled in by searchWithStats.
+
+      algorithm:        name of the search function
+      problem:          class name of the search problem
+      layout:           name of the layout, if the caller sets it
+      nodesExpanded:    calls to getSuccessors (and getPredecessors)
+      nodesGenerated:   successors those calls returned
+      duplicatePushes:  generated successors whose state had been generated
+                        before, minus the ones the algorithm dropped itself
+                        (_pushesAvoided)
+      fringeHighWater:  largest fringe the algorithm recorded, or None
+      heuristicCalls:   calls to the heuristic, if one was passed
+      heuristicTime:    seconds spent in those calls
+      wallTime:         seconds for the whole search
+      peakMemory:       peak bytes allocated during the search (tracemalloc),
+                        or None if memory was not tracked
+      pathLength:       number of actions returned
+      pathCost:         problem.getCostOfActions of the path
+    """
+    FIELDS = ['algorithm', 'problem', 'layout', 'nodesExpanded', 'nodesGenerated',
+              'duplicatePushes', 'fringeHighWater', 'heuristicCalls', 'heuristicTime',
+              'wallTime', 'peakMemory', 'pathLength', 'pathCost']
+
+    def __init__(self, algorithm, problem):
+        for field in self.FIELDS:
+            setattr(self, field, None)
+        self.algorithm = algorithm
+        self.problem = problem
+        self.nodesExpanded = 0
+        self.nodesGenerated = 0
+        self.duplicatePushes = 0
+        self.heuristicCalls = 0
+        self.heuristicTime = 0.0
+
+    def asDict(self):
+        return dict((field, getattr(self, field)) for field in self.FIELDS)
+
+    def __str__(self):
+        return '\n'.join(['%s: %s' % (field, value) for field, value in self.asDict().items() if value is not None])
+
+def searchWithStats(searchFunction, problem: SearchProblem, trackMemory=True, **searchArgs):
+    """
+    Runs searchFunction(problem, **searchArgs) and returns (path, stats) where
+    stats is a SearchStats for the run.  Works with every search function in
+    this file.
+
+    While the search runs, the problem's getSuccessors (and getPredecessors,
+    if it has one) and the 'heuristic' argument, if given, are wrapped to
+    count calls; they are restored afterwards.  Counting duplicates keeps a
+    set of generated states, and trackMemory runs tracemalloc, which slows
+    the search down; both are included in wallTime and peakMemory.
+    """
+    import time, tracemalloc
+    stats = SearchStats(getattr(searchFunction, '__name__', str(searchFunction)), type(problem).__name__)
+    seen = set([problem.getStartState()])
+    if hasattr(problem, 'getGoalState'):
+        seen.add(problem.getGoalState())
+
+    def counting(expand):
+        def countedExpand(state):
+            successors = expand(state)
+            stats.nodesExpanded += 1
+            stats.nodesGenerated += len(successors)
+            for successor in successors:
+                if successor[0] in seen:
+                    stats.duplicatePushes += 1
+                else:
+                    seen.add(successor[0])
+            return successors
+        return countedExpand
+
+    if 'heuristic' in searchArgs:
+        heuristic = searchArgs['heuristic']
+        def timedHeuristic(state, problem=None):
+            start = time.perf_counter()
+            value = heuristic(state, problem)
+            stats.heuristicTime += time.perf_counter() - start
+            stats.heuristicCalls += 1
+            return value
+        searchArgs['heuristic'] = timedHeuristic
+
+    wrapped = dict((name, problem.__dict__.get(name)) for name in ['getSuccessors', 'getPredecessors'] if hasattr(problem, name))
+    for name in wrapped:
+        setattr(problem, name, counting(getattr(problem, name)))
+    startedTracing = trackMemory and not tracemalloc.is_tracing()
+    if startedTracing:
+        tracemalloc.start()
+    elif trackMemory:
+        tracemalloc.reset_peak()
+    try:
+        start = time.perf_counter()
+        path = searchFunction(problem, **searchArgs)
+        stats.wallTime = time.perf_counter() - start
+        if trackMemory:
+            stats.peakMemory = tracemalloc.get_traced_memory()[1]
+    finally:
+        if startedTracing:
+            tracemalloc.stop()
+        for name, original in wrapped.items():
+            if original is None:
+                delattr(problem, name)
+            else:
+                setattr(problem, name, original)
+
+    if path is None:
+        path = []
+    stats.duplicatePushes -= getattr(problem, '_pushesAvoided', 0)
+    stats.fringeHighWater = getattr(problem, '_fringeHighWater', None)
+    stats.pathLength = len(path)
+    stats.pathCost = problem.getCostOfActions(path)
+    return path, stats
+
+def searchSteps(searchFunction, problem: SearchProblem, batchSize=100, **searchArgs):
+    """
+    A generator version of searchFunction(problem, **searchArgs): yields the
+    expanded states in lists of up to batchSize, in expansion order, and
+    returns the path (path = yield from searchSteps(...)).  Nothing is
+    recorded for the display unless the caller asks for it this way.
+
+    depthFirstSearch, breadthFirstSearch, uniformCostSearch and aStarSearch
+    run through a SearchSession and search one batch per resumption.  Other
+    search functions run to the end on the first resumption, with the
+    problem's getSuccessors (and getPredecessors) wrapped to record the
+    states they expand, which are then yielded in batches; jumpPointSearch,
+    which does not call them, yields nothing.
+    """
+    strategies = {depthFirstSearch: 'dfs', breadthFirstSearch: 'bfs',
+                  uniformCostSearch: 'ucs', aStarSearch: 'astar'}
+    if searchFunction in strategies and not searchArgs.get('dedupe'):
+        session = SearchSession(problem, strategies[searchFunction], searchArgs.get('heuristic', nullHeuristic))
+        return (yield from session.expansions(batchSize))
+
+    expanded = []
+    def recording(expand):
+        def recordedExpand(state):
+            expanded.append(state)
+            return expand(state)
+        return recordedExpand
+
+    wrapped = dict((name, problem.__dict__.get(name)) for name in ['getSuccessors', 'getPredecessors'] if hasattr(problem, name))
+    for name in wrapped:
+        setattr(problem, name, recording(getattr(problem, name)))
+    try:
+        path = searchFunction(problem, **searchArgs)
+    finally:
+        for name, original in wrapped.items():
+            if original is None:
+                delattr(problem, name)
+            else:
+                setattr(problem, name, original)
+    for start in range(0, len(expanded), batchSize):
+        yield expanded[start:start + batchSize]
+    return path
+
+def solveMany(problems, fn=None, heuristic=None, workers=None):
+    """
+    Solves many search problems that share one wall Grid (for example
+    PositionSearchProblems with different starts and goals on one layout)
+    on a pool of worker processes.  Yields (index, path) pairs in the order
+    the searches finish, where index is the problem's position in
+    'problems'; each path is the one fn(problem) returns when run serially.
+
+      fn:        a module-level search function (default aStarSearch)
+      heuristic: a module-level heuristic passed to fn, or None
+      workers:   number of processes (default: one per CPU); with 1 the
+                 problems are solved in this process
+
+    The walls are copied once into a shared-memory block that every worker
+    reads when it starts; each task only pickles the problem without its
+    walls.  Display updates are turned off in the workers.  When a result
+    arrives, the problem's _expanded is set to the count of the worker's run.
+    """
+    import copy, os
+    if fn is None:
+        fn = aStarSearch
+    searchArgs = {} if heuristic is None else {'heuristic': heuristic}
+    problems = list(problems)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(problems) <= 1:
+        for index, problem in enumerate(problems):
+            yield index, fn(problem, **searchArgs)
+        return
+
+    from multiprocessing import Pool, shared_memory
+    walls = problems[0].walls
+    for problem in problems:
+        if problem.walls is not walls and problem.walls != walls:
+            raise ValueError('solveMany needs problems that share one wall Grid')
+    cells = bytes(walls[x][y] for x in range(walls.width) for y in range(walls.height))
+    block = shared_memory.SharedMemory(create=True, size=max(len(cells), 1))
+    block.buf[:len(cells)] = cells
+
+    tasks = []
+    for index, problem in enumerate(problems):
+        task = copy.copy(problem)
+        task.walls = None
+        if hasattr(task, 'visualize'):
+            task.visualize = False
+        if hasattr(task, 'trackVisited'):
+            task.trackVisited = False
+        tasks.append((index, task))
+
+    pool = Pool(workers, _solveManyInit, (block.name, walls.width, walls.height, fn, searchArgs))
+    try:
+        chunkSize = max(1, len(tasks) // (workers * 4))
+        for index, path, expanded in pool.imap_unordered(_solveManyTask, tasks, chunkSize):
+            if expanded is not None:
+                problems[index]._expanded = expanded
+            yield index, path
+    finally:
+        pool.terminate()
+        pool.join()
+        block.close()
+        block.unlink()
+
+# State of a solveMany worker process, set by _solveManyInit
+_solveManyWorker = {}
+
+def _solveManyInit(blockName, width, height, fn, searchArgs):
+    "Rebuilds the shared wall Grid once per worker process"
+    from multiprocessing import shared_memory
+    from game import Grid
+    block = shared_memory.SharedMemory(name=blockName)
+    walls = Grid(width, height)
+    for x in range(width):
+        walls[x] = [cell == 1 for cell in block.buf[x * height:(x + 1) * height]]
+    block.close()
+    _solveManyWorker.update(walls=walls, fn=fn, searchArgs=searchArgs)
+
+def _solveManyTask(task):
+    index, problem = task
+    problem.walls = _solveManyWorker['walls']
+    path = _solveManyWorker['fn'](problem, **_solveManyWorker['searchArgs'])
+    return index, path, getattr(problem, '_expanded', None)
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
-ucs = uniformCostSearch
\ No newline at end of file
+ucs = uniformCostSearch
+bibfs = bidirectionalSearch
+biastar = bidirectionalAStarSearch
+idastar = iterativeDeepeningAStarSearch
+smastar = simplifiedMemoryBoundedAStarSearch
+jps = jumpPointSearch
+arastar = anytimeRepairingAStarSearch
\ No newline at end of file
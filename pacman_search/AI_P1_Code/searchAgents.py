@@ -38,11 +38,24 @@ from typing import List, Tuple, Any
 from game import Directions
 from game import Agent
 from game import Actions
+from game import FoodBits, FoodIndex
 import util
 import time
+import ast
+import os
+import json
+import itertools
+import hashlib
+import weakref
+from array import array
 import search
 import pacman
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
 
@@ -70,21 +83,60 @@ class SearchAgent(Agent):
     Options for fn include:
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
+      bidirectionalSearch or bibfs
+      bidirectionalAStarSearch or biastar
+      iterativeDeepeningAStarSearch or idastar
+      simplifiedMemoryBoundedAStarSearch or smastar (-a nodeBudget=5000)
+      jumpPointSearch or jps (grid problems with unit costs)
+      anytimeRepairingAStarSearch or arastar (-a weight=3,weightStep=0.5)
+
+    The bidirectional searches need a problem with a single goal that also
+    provides getGoalState and getPredecessors, such as PositionSearchProblem.
+
+    Other agent arguments are passed to the search function, e.g.
+      -a fn=astar,heuristic=manhattanHeuristic,dedupe=True
+
+    searchStats='json' or 'text' (pacman.py --searchStats) runs the search
+    through search.searchWithStats and prints the resulting SearchStats.
+
+    displayBatch=N draws the cells a PositionSearchProblem search expands
+    while it searches, N expansions at a time (see search.searchSteps),
+    instead of all at once when the goal is found.
+
+    timeBudget (seconds, e.g. -a fn=arastar,timeBudget=0.5) bounds the wall
+    time of registerInitialState for anytime searches, which take a
+    timeBudget argument; the agent follows the best path found within it.
 
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', searchStats=None, timeBudget=None, displayBatch=None, **searchArgs):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
+        # Any other agent arguments (e.g. -a fn=ucs,dedupe=True) are passed on
+        # to the search function as keyword arguments
+        searchArgs = dict([(key, parseSearchArg(value)) for key, value in searchArgs.items()])
+
         # Get the search function from the name and heuristic
         if fn not in dir(search):
             raise AttributeError(fn + ' is not a search function in search.py.')
         func = getattr(search, fn)
+        for key in searchArgs:
+            if key not in func.__code__.co_varnames:
+                raise AttributeError(key + ' is not an argument of ' + fn + ' in search.py.')
+        if timeBudget is not None and 'timeBudget' not in func.__code__.co_varnames:
+            raise AttributeError(fn + ' in search.py does not take a timeBudget.')
+        self.searchStats = searchStats
+        self.timeBudget = parseSearchArg(timeBudget)
+        self.displayBatch = parseSearchArg(displayBatch)
+        self.searchCall = (func, searchArgs)
         if 'heuristic' not in func.__code__.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
+            if searchArgs:
+                self.searchFunction = lambda x: func(x, **searchArgs)
+            else:
+                self.searchFunction = func
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -93,8 +145,9 @@ class SearchAgent(Agent):
             else:
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
+            self.searchCall = (func, dict(searchArgs, heuristic=heur))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x: func(x, heuristic=heur, **searchArgs)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -114,12 +167,49 @@ class SearchAgent(Agent):
         if self.searchFunction == None: raise Exception("No search function provided for SearchAgent")
         starttime = time.time()
         problem = self.searchType(state) # Makes a new search problem
-        self.actions  = self.searchFunction(problem) # Find a path
+        func, searchArgs = getattr(self, 'searchCall', (self.searchFunction, {}))
+        if getattr(self, 'timeBudget', None) is not None:
+            # the budget also covers building the problem
+            searchArgs = dict(searchArgs, timeBudget=max(0, self.timeBudget - (time.time() - starttime)))
+        if getattr(self, 'searchStats', None):
+            self.actions, stats = search.searchWithStats(func, problem, **searchArgs)
+        elif getattr(self, 'timeBudget', None) is not None:
+            self.actions = func(problem, **searchArgs)
+        elif getattr(self, 'displayBatch', None) and isinstance(problem, PositionSearchProblem):
+            self.actions = self.searchWhileDrawing(problem, func, searchArgs)
+        else:
+            self.actions  = self.searchFunction(problem) # Find a path
         if self.actions == None:
             self.actions = []
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if '_fringeHighWater' in dir(problem): print('Fringe high-water mark: %d' % problem._fringeHighWater)
+        if '_pushesAvoided' in dir(problem): print('Fringe pushes avoided: %d' % problem._pushesAvoided)
+        if '_nodeHighWater' in dir(problem): print('Search nodes held at most: %d' % problem._nodeHighWater)
+        if '_suboptimalityBound' in dir(problem): print('Path cost at most %.3f times optimal' % problem._suboptimalityBound)
+        if getattr(self, 'searchStats', None):
+            fileName = getattr(state.data.layout, 'fileName', None)
+            if fileName is not None:
+                stats.layout = os.path.splitext(os.path.basename(fileName))[0]
+            if self.searchStats == 'json':
+                print(json.dumps(stats.asDict(), sort_keys=True))
+            else:
+                print(stats)
+
+    def searchWhileDrawing(self, problem, func, searchArgs):
+        "Runs the search through search.searchSteps, drawing each batch of expanded cells"
+        import __main__
+        display = getattr(__main__, '_display', None)
+        problem.visualize = False # the cells are drawn here, not at the goal
+        steps = search.searchSteps(func, problem, self.displayBatch, **searchArgs)
+        while True:
+            try:
+                cells = next(steps)
+            except StopIteration as stop:
+                return stop.value
+            if 'addExpandedCells' in dir(display):
+                display.addExpandedCells(cells)
 
     def getAction(self, state):
         """
@@ -137,6 +227,22 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+def parseSearchArg(value):
+    """
+    Converts an agent argument given on the command line, such as '3', '0.5'
+    or 'False', to the Python value it spells.  Anything else stays a string.
+    """
+    if not isinstance(value, str):
+        return value
+    try:
+        return ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+
+def unitCost(position):
+    "The default cost function of PositionSearchProblem; unlike a lambda it can be pickled"
+    return 1
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -147,21 +253,25 @@ class PositionSearchProblem(search.SearchProblem):
 
     Note: this search problem is fully specified; you should NOT change it.
     """
+    trackVisited = True # for subclasses that do not call __init__
 
-    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn = unitCost, goal=(1,1), start=None, warn=True, visualize=True, trackVisited=True):
         """
         Stores the start and goal.
 
         gameState: A GameState object (pacman.py)
         costFn: A function from a search state (tuple) to a non-negative number
         goal: A position in the gameState
+        trackVisited: False skips the _visited/_visitedlist bookkeeping (and
+          with it the drawing of expanded cells), for runs without a display
         """
         self.walls = gameState.getWalls()
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
         self.costFn = costFn
-        self.visualize = visualize
+        self.visualize = visualize and trackVisited
+        self.trackVisited = trackVisited
         if warn and (gameState.getNumFood() != 1 or not gameState.hasFood(*goal)):
             print('Warning: this does not look like a regular search maze')
 
@@ -196,23 +306,61 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
+        table = getSuccessorTable(self.walls)
+        cells = table.cells
         successors = []
+        cell = table.index.get(state)
+        if cell is not None:
+            for neighbour, action in table.successors[cell]:
+                nextState = cells[neighbour]
+                successors.append( ( nextState, action, self.costFn(nextState)) )
+        else:
+            # not an open cell (e.g. a start on a wall): check the walls directly
+            for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                x,y = state
+                dx, dy = Actions.directionToVector(action)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if not self.walls[nextx][nexty]:
+                    nextState = (nextx, nexty)
+                    successors.append( ( nextState, action, self.costFn(nextState)) )
+
+        # Bookkeeping for display purposes
+        self._expanded += 1 # DO NOT CHANGE
+        if self.trackVisited and state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return successors
+
+    def getGoalState(self):
+        "Returns the single goal position, for searches that also work backwards."
+        return self.goal
+
+    def getPredecessors(self, state):
+        """
+        Returns the states from which 'state' can be reached in one move, as
+        triples (predecessor, action, stepCost) where 'action' leads from
+        'predecessor' to 'state' and 'stepCost' is the cost of that move.
+        This is the successor function run backwards, and is what the
+        bidirectional searches in search.py expand from the goal.
+        """
+
+        predecessors = []
+        cost = self.costFn(state)
         for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
             x,y = state
             dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+            prevx, prevy = int(x - dx), int(y - dy)
+            if not self.walls[prevx][prevy]:
+                predecessors.append( ( (prevx, prevy), action, cost) )
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
-        if state not in self._visited:
+        if self.trackVisited and state not in self._visited:
             self._visited[state] = True
             self._visitedlist.append(state)
 
-        return successors
+        return predecessors
 
     def getCostOfActions(self, actions):
         """
@@ -280,6 +428,11 @@ class CornersProblem(search.SearchProblem):
     This search problem finds paths through all four corners of a layout.
 
     You must select a suitable state space and successor function
+
+    A state is one int, cell << 4 | mask, which hashes and compares faster
+    than a tuple and takes less memory: cell is x * height + y for Pacman's
+    (x, y) position and bit i of mask is set once self.corners[i] was
+    visited.  Use getPosition and getVisitedCorners to read a state.
     """
 
     def __init__(self, startingGameState: pacman.GameState):
@@ -296,21 +449,44 @@ class CornersProblem(search.SearchProblem):
         self._expanded = 0 # DO NOT CHANGE; Number of search nodes expanded
         self.startingGameState = startingGameState
 
+        # moves[cell] is a tuple of (neighbour cell, action, corner bit of the
+        # neighbour) per move out of an open cell, and None for a wall
+        height = self.walls.height
+        cornerBits = dict((corner, 1 << i) for i, corner in enumerate(self.corners))
+        table = getSuccessorTable(self.walls)
+        self.moves = [None] * (self.walls.width * height)
+        for (x, y), cellMoves in zip(table.cells, table.successors):
+            self.moves[x * height + y] = tuple(
+                (table.cells[j][0] * height + table.cells[j][1], action, cornerBits.get(table.cells[j], 0))
+                for j, action in cellMoves)
+        self.allCorners = (1 << len(self.corners)) - 1
+        self.visitedFlags = [tuple([mask & (1 << i) != 0 for i in range(len(self.corners))])
+                             for mask in range(self.allCorners + 1)]
+        self.heuristicInfo = {} # A dictionary for the heuristic to store information
+
     def getStartState(self):
         """
         Returns the start state (in your state space, not the full Pacman state
         space)
         """
         "*** YOUR CODE HERE ***"
-        return (self.startingPosition, (False, False, False, False))
+        x, y = self.startingPosition
+        return (x * self.walls.height + y) << 4
     
     def isGoalState(self, state: Any):
         """
         Returns whether this search state is a goal state of the problem.
         """
         "*** YOUR CODE HERE ***"
-        position, visited_corners = state
-        return all(visited_corners)
+        return state & 15 == self.allCorners
+
+    def getPosition(self, state: Any):
+        "Returns Pacman's (x, y) position in a state"
+        return divmod(state >> 4, self.walls.height)
+
+    def getVisitedCorners(self, state: Any):
+        "Returns a tuple with one bool per corner, True if the state has visited it"
+        return self.visitedFlags[state & 15]
 
     def getSuccessors(self, state: Any):
         """
@@ -323,27 +499,21 @@ class CornersProblem(search.SearchProblem):
             is the incremental cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            #   x,y = currentPosition
-            #   dx, dy = Actions.directionToVector(action)
-            #   nextx, nexty = int(x + dx), int(y + dy)
-            #   hitsWall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"
-            current_position, visited_corners = state
-            x, y = current_position
-            dx, dy = Actions.directionToVector(action)
-            next_x, next_y = int(x + dx), int(y + dy)
-            if self.walls[next_x][next_y] == False:
-                next_position = (next_x, next_y)
-                temp_visited_corners = list(visited_corners)
-                if next_position in self.corners:
-                    temp_visited_corners[self.corners.index(next_position)] = True
-                next_state = (next_position, tuple(temp_visited_corners))
-                successors.append((next_state, action, 1))
+        "*** YOUR CODE HERE ***"
+        mask = state & 15
+        moves = self.moves[state >> 4]
+        if moves is None:
+            # not an open cell (e.g. a start on a wall): check the walls directly
+            x, y = self.getPosition(state)
+            height = self.walls.height
+            moves = []
+            for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(action)
+                nextx, nexty = int(x + dx), int(y + dy)
+                if not self.walls[nextx][nexty]:
+                    bit = 1 << self.corners.index((nextx, nexty)) if (nextx, nexty) in self.corners else 0
+                    moves.append((nextx * height + nexty, action, bit))
+        successors = [((neighbour << 4) | mask | bit, action, 1) for neighbour, action, bit in moves]
 
         self._expanded += 1 # DO NOT CHANGE
         return successors
@@ -380,11 +550,11 @@ def cornersHeuristic(state: Any, problem: CornersProblem):
     walls = problem.walls # These are the walls of the maze, as a Grid (game.py)
 
     "*** YOUR CODE HERE ***"
-    position, visiting_status = state
+    position, visited = problem.getPosition(state), problem.getVisitedCorners(state)
     
     heuristic = 0
     if not problem.isGoalState(state):
-        unvisited_corners = [corner for corner, status in zip(corners, visiting_status) if status is False]
+        unvisited_corners = [corner for corner, done in zip(corners, visited) if not done]
         while unvisited_corners:
             closest_corner_distance = float("inf")
             closest_corner = unvisited_corners[0]
@@ -401,6 +571,76 @@ def cornersHeuristic(state: Any, problem: CornersProblem):
 
     return heuristic
 
+def shortestCornerTour(table, position, corners):
+    """
+    Returns (cost, order) of the shortest route from position through all of
+    corners, trying every order (at most 4! = 24) with distances from the
+    MazeDistanceTable, or (None, None) if a corner cannot be reached.  A
+    corner at position itself still has to be entered (CornersProblem starts
+    with no corner visited), which takes a step out and back.
+    """
+    best = (None, None)
+    for order in itertools.permutations(corners):
+        cost, here = 0, position
+        for corner in order:
+            distance = table.getDistance(here, corner) if corner != here else 2
+            if distance < 0:
+                break
+            cost, here = cost + distance, corner
+        else:
+            if best[0] is None or cost < best[0]:
+                best = (cost, order)
+    return best
+
+def cornersTourHeuristic(state: Any, problem: CornersProblem):
+    """
+    The length of the shortest route from Pacman's position through the
+    unvisited corners in maze distance, which is the true cost to the goal,
+    so it is admissible and consistent.  Values are memoized per state in
+    problem.heuristicInfo['cornerTours'].
+    """
+    tours = problem.heuristicInfo.setdefault('cornerTours', {})
+    if state not in tours:
+        table = getMazeDistanceTable(problem.startingGameState)
+        unvisited = [corner for corner, done in zip(problem.corners, problem.getVisitedCorners(state)) if not done]
+        cost, order = shortestCornerTour(table, problem.getPosition(state), unvisited)
+        tours[state] = 0 if cost is None else cost
+    return tours[state]
+
+def cornersTourSearch(problem: CornersProblem) -> List[str]:
+    """
+    Solves a CornersProblem without searching its state space: the shortest
+    corner order is found by shortestCornerTour and the path of each leg is
+    read off the layout's MazeDistanceTable.
+    """
+    table = getMazeDistanceTable(problem.startingGameState)
+    state = problem.getStartState()
+    position = problem.getPosition(state)
+    unvisited = [corner for corner, done in zip(problem.corners, problem.getVisitedCorners(state)) if not done]
+    if any(corner not in table.index for corner in unvisited):
+        print("This search doesn't have any answer!")
+        return []
+    cost, order = shortestCornerTour(table, position, unvisited)
+    if order is None:
+        print("This search doesn't have any answer!")
+        return []
+
+    path = []
+    for corner in order:
+        if corner == position:
+            neighbour, action = table.successors[table.index[position]][0]
+            path += [action, Actions.reverseDirection(action)]
+        else:
+            path += table.getPath(position, corner)
+        position = corner
+    return path
+
+class CornersTourAgent(SearchAgent):
+    "A SearchAgent for CornersProblem that plans the corner tour directly"
+    def __init__(self):
+        self.searchFunction = cornersTourSearch
+        self.searchType = CornersProblem
+
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
@@ -457,6 +697,36 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+class BitFoodSearchProblem(FoodSearchProblem):
+    """
+    The FoodSearchProblem with the remaining food stored as a FoodBits (see
+    game.py) instead of a Grid.  A state is ( pacmanPosition, foodBits ), so
+    generating a successor clears one bit instead of copying the grid and
+    hashing a state hashes one int.
+
+    foodBits reads like a food Grid (count, asList, foodBits[x][y]), so the
+    food heuristics work unchanged; foodBits.asGrid() converts it back.
+    Select it with -a prob=BitFoodSearchProblem.
+    """
+    def __init__(self, startingGameState: pacman.GameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        self.start = (self.start[0], FoodBits.fromGrid(self.start[1]))
+
+    def isGoalState(self, state):
+        return state[1].bits == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        successors = []
+        self._expanded += 1 # DO NOT CHANGE
+        x,y = state[0]
+        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+            dx, dy = Actions.directionToVector(direction)
+            nextx, nexty = int(x + dx), int(y + dy)
+            if not self.walls[nextx][nexty]:
+                successors.append( ( ((nextx, nexty), state[1].eat((nextx, nexty))), direction, 1) )
+        return successors
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
@@ -502,6 +772,61 @@ def foodHeuristic(state: Tuple[Tuple, List[List]], problem: FoodSearchProblem):
             heuristic = distance
     return heuristic
 
+def foodHeuristicMST(state, problem):
+    """
+    The maze distance to the nearest food plus the weight of a minimum
+    spanning tree over the remaining food, with edges weighted by maze
+    distance.  Any path that eats all the food first walks to some food and
+    then connects every other food to it, so this never overestimates.  It
+    dominates foodHeuristic, which is at most the nearest-food distance plus
+    one path through the tree.
+
+    Distances come from the layout's MazeDistanceTable.  The tree only
+    depends on the food that is left, so its weight is memoized in
+    problem.heuristicInfo['foodTrees'] by food bitmask.  Works with both
+    FoodSearchProblem and BitFoodSearchProblem states.
+    """
+    position, food = state
+    info = problem.heuristicInfo
+    if 'mazeDistances' not in info:
+        info['mazeDistances'] = getMazeDistanceTable(problem.startingGameState)
+        info['foodIndex'] = FoodIndex(problem.startingGameState.getFood())
+        info['foodTrees'] = {}
+    if not isinstance(food, FoodBits):
+        food = FoodBits.fromGrid(food, info['foodIndex'])
+    if food.bits == 0:
+        return 0
+
+    table = info['mazeDistances']
+    foodList = food.asList()
+    treeWeight = info['foodTrees'].get(food.bits)
+    if treeWeight is None:
+        treeWeight = info['foodTrees'][food.bits] = _spanningTreeWeight(foodList, table)
+    return min([table.getDistance(position, dot) for dot in foodList]) + treeWeight
+
+def _spanningTreeWeight(points, table):
+    "Weight of a minimum spanning tree over points under maze distance (Prim)"
+    index = table.index
+    rows = [index[point] * table.size for point in points]
+    columns = [index[point] for point in points]
+    distances = table.distances
+    weight = 0
+    # cheapest known edge from the tree to each point outside it
+    start = rows.pop()
+    columns.pop()
+    closest = [int(distances[start + column]) for column in columns]
+    while closest:
+        nearest = min(range(len(closest)), key=closest.__getitem__)
+        weight += closest[nearest]
+        row = rows.pop(nearest)
+        columns.pop(nearest)
+        closest.pop(nearest)
+        for i, column in enumerate(columns):
+            distance = int(distances[row + column])
+            if distance < closest[i]:
+                closest[i] = distance
+    return weight
+
 def foodHeuristicNearest(state, problem):
     """
     This heuristic consider the nearest food.
@@ -548,16 +873,25 @@ class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
         self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+        finder = ClosestDotFinder(state)
+        position = state.getPacmanPosition()
+        while finder.hasFood():
+            if position in finder.food:
+                # a dot under Pacman (e.g. at the start) takes a path of no
+                # moves, which pathToClosestDot cannot tell from no path
+                finder.eat(position)
+                continue
+            nextPathSegment = finder.pathToClosestDot(position)
+            if not nextPathSegment:
+                print('Warning: %d dots cannot be reached' % len(finder.food))
+                break
             self.actions += nextPathSegment
             for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+                dx, dy = Actions.directionToVector(action)
+                position = (int(position[0] + dx), int(position[1] + dy))
+                if finder.walls[position[0]][position[1]]:
+                    raise Exception('pathToClosestDot returned an illegal move: %s!' % action)
+            finder.eat(position)
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -574,6 +908,43 @@ class ClosestDotSearchAgent(SearchAgent):
         "*** YOUR CODE HERE ***"
         return search.breadthFirstSearch(problem)
 
+class ClosestDotFinder:
+    """
+    Plans the greedy closest-dot tour of ClosestDotSearchAgent without a new
+    search per dot.  The remaining food is kept as a set of cells and the
+    distances come from the layout's MazeDistanceTable, so finding the
+    closest dot costs one table lookup per remaining dot and the path to it
+    is read off the table one move at a time.
+
+    Ties between equally close dots go to the lowest (x, y), so the tour may
+    differ from one built with breadthFirstSearch, but every segment is a
+    shortest path to a closest dot.
+    """
+    def __init__(self, gameState: pacman.GameState):
+        self.walls = gameState.getWalls()
+        self.distances = getMazeDistanceTable(gameState)
+        self.food = set(gameState.getFood().asList())
+
+    def hasFood(self):
+        return len(self.food) > 0
+
+    def eat(self, position):
+        self.food.discard(position)
+
+    def pathToClosestDot(self, position):
+        """
+        Returns a shortest path from position to the closest remaining dot, or
+        [] if no dot can be reached.  Dots passed on the way cannot exist,
+        since they would be closer.
+        """
+        getDistance = self.distances.getDistance
+        reachable = [(getDistance(position, dot), dot) for dot in self.food]
+        reachable = [(distance, dot) for distance, dot in reachable if distance >= 0]
+        if not reachable:
+            return []
+        distance, target = min(reachable)
+        return self.distances.getPath(position, target)
+
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
     A search problem for finding a path to any food.
@@ -597,7 +968,7 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
         self.startState = gameState.getPacmanPosition()
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state: Tuple[int, int]):
@@ -608,13 +979,15 @@ class AnyFoodSearchProblem(PositionSearchProblem):
         x,y = state
 
         "*** YOUR CODE HERE ***"
-        return state in self.food.asList()
+        return self.food[x][y]
 
 def mazeDistance(point1: Tuple[int, int], point2: Tuple[int, int], gameState: pacman.GameState) -> int:
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points. The gameState can be any
+    game state -- Pacman's position in that state is ignored.
+
+    Distances are looked up in the MazeDistanceTable of the layout's walls,
+    which is built on the first call (see getMazeDistanceTable).
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -625,5 +998,207 @@ def mazeDistance(point1: Tuple[int, int], point2: Tuple[int, int], gameState: pa
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
\ No newline at end of file
+    distance = getMazeDistanceTable(gameState).getDistance(point1, point2)
+    # like the BFS this replaces, points that cannot reach each other are 0 apart
+    return max(distance, 0)
+
+class SuccessorTable:
+    """
+    The moves between the open cells of a wall Grid, computed once per layout
+    (see getSuccessorTable) so that search problems do not recompute
+    direction vectors and wall lookups on every expansion.
+
+    Open cells are numbered column by column: cells[i] is the (x, y) of cell
+    i and index maps a position back to i.  successors[i] is a tuple of
+    (j, action) pairs, one per move out of cell i, in the NORTH, SOUTH, EAST,
+    WEST order the search problems have always used.
+    """
+
+    def __init__(self, walls):
+        self.cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        self.index = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.successors = []
+        for x, y in self.cells:
+            moves = []
+            for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                dx, dy = Actions.directionToVector(action)
+                neighbour = self.index.get((int(x + dx), int(y + dy)))
+                if neighbour is not None:
+                    moves.append((neighbour, action))
+            self.successors.append(tuple(moves))
+
+def _getByGrid(cache, walls):
+    """
+    Returns the value cached for this very wall Grid object by _putByGrid, or
+    None.  The cache is keyed by identity, so lookups cost no hashing of the
+    walls, and holds the Grid weakly, so entries go when the Grid does.
+    """
+    cached = cache.get(id(walls))
+    if cached is not None and cached[0]() is walls:
+        return cached[1]
+    return None
+
+def _putByGrid(cache, walls, value):
+    key = id(walls)
+    cache[key] = (weakref.ref(walls, lambda ref: cache.pop(key, None)), value)
+
+# SuccessorTables by the identity of their wall Grid, which every game state
+# of a layout shares (see _getByGrid)
+_SUCCESSOR_TABLES = {}
+
+def getSuccessorTable(walls) -> SuccessorTable:
+    "Returns the SuccessorTable of a wall Grid, building it on first use"
+    table = _getByGrid(_SUCCESSOR_TABLES, walls)
+    if table is None:
+        table = SuccessorTable(walls)
+        _putByGrid(_SUCCESSOR_TABLES, walls, table)
+    return table
+
+class MazeDistanceTable:
+    """
+    The maze distance between every pair of open cells of a wall Grid.
+
+    Open cells are numbered as in the layout's SuccessorTable and the
+    distances are stored in one flat int16 matrix of (number of open cells)^2 entries, filled by a
+    BFS from every open cell.  Cells that cannot reach each other are -1
+    apart.  The matrix is a NumPy array when NumPy is installed (possibly
+    memory-mapped from a .npy file, see getMazeDistanceTable) and an
+    array('h') otherwise.
+    """
+
+    def __init__(self, walls, distances=None):
+        """
+        walls: the wall Grid of a layout
+        distances: a previously computed matrix for the same walls, if any
+        """
+        successorTable = getSuccessorTable(walls)
+        self.cells = successorTable.cells
+        self.index = successorTable.index
+        self.successors = successorTable.successors
+        self.size = len(self.cells)
+        if distances is None:
+            distances = self._computeDistances(successorTable)
+        self.distances = distances
+
+    def _computeDistances(self, successorTable):
+        n = self.size
+        neighbours = [[neighbour for neighbour, action in moves] for moves in successorTable.successors]
+
+        distances = array('h', [-1]) * (n * n)
+        for source in range(n):
+            row = source * n
+            distances[row + source] = 0
+            layer, depth = [source], 0
+            while layer:
+                depth += 1
+                nextLayer = []
+                for cell in layer:
+                    for neighbour in neighbours[cell]:
+                        if distances[row + neighbour] < 0:
+                            distances[row + neighbour] = depth
+                            nextLayer.append(neighbour)
+                layer = nextLayer
+
+        if numpy is not None:
+            return numpy.frombuffer(distances, dtype=numpy.int16)
+        return distances
+
+    def getDistance(self, point1, point2):
+        "Returns the maze distance between two open cells, or -1 if there is no path"
+        return int(self.distances[self.index[point1] * self.size + self.index[point2]])
+
+    def getPath(self, point1, point2):
+        """
+        Returns the actions of a shortest path between two open cells, read off
+        the table one move at a time (trying NORTH, SOUTH, EAST, WEST), or None
+        if there is no path.
+        """
+        n, distances = self.size, self.distances
+        cell, target = self.index[point1], self.index[point2]
+        distance = int(distances[cell * n + target])
+        if distance < 0:
+            return None
+        path = []
+        while distance > 0:
+            for neighbour, action in self.successors[cell]:
+                if distances[neighbour * n + target] == distance - 1:
+                    break
+            path.append(action)
+            cell, distance = neighbour, distance - 1
+        return path
+
+    def save(self, fileName):
+        """
+        Writes the matrix to a .npy file.  The file is written under a
+        temporary name first, so a run that loads it concurrently never sees
+        a partial file.
+        """
+        temporary = '%s.%d.tmp' % (fileName, os.getpid())
+        with open(temporary, 'wb') as f:
+            numpy.save(f, numpy.asarray(self.distances, dtype=numpy.int16))
+        os.replace(temporary, fileName)
+
+    @staticmethod
+    def load(walls, fileName):
+        """
+        Returns the table for 'walls' memory-mapped from a .npy file written by
+        save, or None if the file is missing or does not fit the walls.
+        """
+        try:
+            distances = numpy.load(fileName, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        table = MazeDistanceTable(walls, distances)
+        if distances.dtype != numpy.int16 or distances.shape != (table.size * table.size,):
+            return None
+        return table
+
+# MazeDistanceTables by wall-grid hash, and by the identity of the wall Grid
+# so that repeated lookups on the same layout do not rehash the walls
+MAZE_DISTANCE_TABLES = {}
+_MAZE_DISTANCE_TABLES_BY_GRID = {}
+
+# Directory tables are saved in between runs, from the environment variable
+# PACMAN_MAZE_DISTANCE_CACHE; None (the default) keeps them in memory only
+MAZE_DISTANCE_CACHE_DIR = os.environ.get('PACMAN_MAZE_DISTANCE_CACHE') or None
+
+def wallsHash(walls) -> str:
+    "A hash of a wall Grid that is stable across runs"
+    return hashlib.sha1(str(walls).encode()).hexdigest()[:16]
+
+def getMazeDistanceTable(gameState: pacman.GameState) -> MazeDistanceTable:
+    """
+    Returns the MazeDistanceTable for the walls of gameState, building it only
+    once per wall layout.
+
+    If NumPy is installed, MAZE_DISTANCE_CACHE_DIR is set and the layout was
+    read from a .lay file, the table is also kept in a '<layout>.<hash>.npy'
+    file in that directory, where <hash> is wallsHash of the walls.  Later
+    runs memory-map that file instead of running the BFS again; editing the
+    walls changes the hash, so a stale file is never used.
+    """
+    walls = gameState.getWalls()
+    table = _getByGrid(_MAZE_DISTANCE_TABLES_BY_GRID, walls)
+    if table is not None:
+        return table
+
+    key = wallsHash(walls)
+    table = MAZE_DISTANCE_TABLES.get(key)
+    if table is None:
+        fileName = getattr(gameState.data.layout, 'fileName', None)
+        if numpy is None or MAZE_DISTANCE_CACHE_DIR is None or fileName is None:
+            table = MazeDistanceTable(walls)
+        else:
+            layoutName = os.path.splitext(os.path.basename(fileName))[0]
+            cacheName = os.path.join(MAZE_DISTANCE_CACHE_DIR, '%s.%s.npy' % (layoutName, key))
+            table = MazeDistanceTable.load(walls, cacheName)
+            if table is None:
+                table = MazeDistanceTable(walls)
+                try:
+                    os.makedirs(MAZE_DISTANCE_CACHE_DIR, exist_ok=True)
+                    table.save(cacheName)
+                except OSError:
+                    pass # e.g. a read-only cache directory; keep the table in memory
+        MAZE_DISTANCE_TABLES[key] = table
+    _putByGrid(_MAZE_DISTANCE_TABLES_BY_GRID, walls, table)
+    return table
\ No newline at end of file
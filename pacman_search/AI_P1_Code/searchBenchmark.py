@@ -0,0 +1,238 @@
+# searchBenchmark.py
+# ------------------
+# Headless benchmark of the search algorithms in search.py.
+#
+# > python searchBenchmark.py -o baseline.json
+# > python searchBenchmark.py -c baseline.json
+#
+# Every layout in layouts/ is crossed with the search problems (Position,
+# Corners, Food) and the algorithms (dfs, bfs, ucs and astar with each
+# heuristic that fits the problem).  Each combination runs -t times without
+# graphics; the table reports nodes expanded, path cost, the median wall
+# time and the peak memory of one extra run under tracemalloc.  Results can
+# be written as CSV or JSON (-o), and -c compares them with a stored results
+# file and exits with status 1 if anything regressed.
+
+import csv
+import json
+import optparse
+import os
+import statistics
+
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+PROBLEMS = ['PositionSearchProblem', 'CornersProblem', 'FoodSearchProblem']
+ALGORITHMS = ['dfs', 'bfs', 'ucs', 'astar']
+
+# heuristics astar is run with, for each problem
+HEURISTICS = {
+    'PositionSearchProblem': ['manhattanHeuristic', 'euclideanHeuristic'],
+    'CornersProblem': ['cornersHeuristic'],
+    'FoodSearchProblem': ['foodHeuristic', 'foodHeuristicMST'],
+    'BitFoodSearchProblem': ['foodHeuristic', 'foodHeuristicMST'],
+}
+
+ROW_FORMAT = '%-18s %-22s %-9s %-20s %-8s %13s %8s %10s %10s'
+COLUMNS = ['layout', 'problem', 'algorithm', 'heuristic', 'status', 'nodesExpanded',
+           'pathCost', 'wallTime', 'peakMemory', 'trials']
+
+
+def isApplicable(problemName, gameState):
+    "Skips problems whose targets are walls on this layout"
+    walls = gameState.getWalls()
+    if problemName == 'PositionSearchProblem':
+        return not walls[1][1]
+    if problemName == 'CornersProblem':
+        top, right = walls.height - 2, walls.width - 2
+        return not any(walls[x][y] for x, y in [(1, 1), (1, top), (right, 1), (right, top)])
+    return gameState.getNumFood() > 0
+
+
+def makeProblem(problemName, gameState):
+    if problemName == 'PositionSearchProblem':
+        return searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False, trackVisited=False)
+    return getattr(searchAgents, problemName)(gameState)
+
+
+def listRuns(layoutNames, problemNames, algorithms):
+    "Yields (layoutName, problemName, algorithm, heuristicName or None)"
+    for layoutName in layoutNames:
+        for problemName in problemNames:
+            for algorithm in algorithms:
+                if algorithm == 'astar':
+                    for heuristicName in HEURISTICS.get(problemName, ['nullHeuristic']):
+                        yield layoutName, problemName, algorithm, heuristicName
+                else:
+                    yield layoutName, problemName, algorithm, None
+
+
+def runOne(gameState, problemName, algorithm, heuristicName, trials, timeLimit):
+    """
+    Runs one combination 'trials' times plus once more under tracemalloc and
+    returns a result row.  A timed run that takes longer than timeLimit
+    seconds ends the combination with status 'timeout'.
+    """
+    searchFunction = getattr(search, algorithm)
+    searchArgs = {}
+    if heuristicName is not None:
+        searchArgs['heuristic'] = getattr(searchAgents, heuristicName)
+    row = {'problem': problemName, 'algorithm': algorithm, 'heuristic': heuristicName or '',
+           'status': 'ok', 'trials': 0}
+
+    def run(trackMemory):
+        problem = makeProblem(problemName, gameState)
+        return search.searchWithStats(searchFunction, problem, trackMemory=trackMemory, **searchArgs)[1]
+
+    times = []
+    util.mutePrint()
+    try:
+        for trial in range(trials):
+            stats = util.TimeoutFunction(run, timeLimit)(False)
+            times.append(stats.wallTime)
+            row['trials'] += 1
+            row['nodesExpanded'] = stats.nodesExpanded
+            row['pathCost'] = stats.pathCost
+        # tracemalloc slows the search down a lot, so a memory run that
+        # times out only leaves the memory column empty
+        try:
+            row['peakMemory'] = util.TimeoutFunction(run, timeLimit)(True).peakMemory
+        except util.TimeoutFunctionException:
+            pass
+    except util.TimeoutFunctionException:
+        row['status'] = 'timeout'
+    except Exception as e:
+        row['status'] = 'error: %s' % type(e).__name__
+    finally:
+        util.unmutePrint()
+    if times:
+        row['wallTime'] = statistics.median(times)
+    return row
+
+
+def runBenchmark(opts):
+    rows = []
+    print(ROW_FORMAT % tuple(COLUMNS[:-1]))
+    for layoutName, problemName, algorithm, heuristicName in listRuns(opts.layouts, opts.problems, opts.algorithms):
+        gameState = pacman.GameState()
+        gameState.initialize(layout.getLayout(layoutName), 0)
+        if not isApplicable(problemName, gameState):
+            continue
+        row = runOne(gameState, problemName, algorithm, heuristicName, opts.trials, opts.timeLimit)
+        row['layout'] = layoutName
+        rows.append(row)
+        print(ROW_FORMAT % tuple(
+            formatValue(row.get(column)) for column in COLUMNS[:-1]))
+    return rows
+
+
+def formatValue(value):
+    if value is None:
+        return '-'
+    if isinstance(value, float):
+        return '%.4f' % value
+    return str(value)
+
+
+def writeResults(rows, fileName):
+    if fileName.endswith('.csv'):
+        with open(fileName, 'w', newline='') as f:
+            writer = csv.DictWriter(f, COLUMNS)
+            writer.writeheader()
+            for row in rows:
+                writer.writerow(row)
+    else:
+        with open(fileName, 'w') as f:
+            json.dump(rows, f, indent=1, sort_keys=True)
+
+
+def readResults(fileName):
+    "Reads a file written by writeResults; CSV numbers are converted back"
+    if not fileName.endswith('.csv'):
+        with open(fileName) as f:
+            return json.load(f)
+    rows = []
+    with open(fileName, newline='') as f:
+        for row in csv.DictReader(f):
+            for column in ['nodesExpanded', 'pathCost', 'peakMemory', 'trials']:
+                row[column] = int(row[column]) if row.get(column) else None
+            row['wallTime'] = float(row['wallTime']) if row.get('wallTime') else None
+            rows.append(row)
+    return rows
+
+
+def findRegressions(rows, baselineRows, tolerance, minTime=0.01):
+    """
+    Returns (row, reason) pairs for every result that is worse than the
+    matching baseline row: a run that no longer finishes, more expansions, a
+    costlier path, or wall time or memory more than 'tolerance' (a fraction)
+    above the baseline.  Time differences under minTime seconds are noise.
+    """
+    def key(row):
+        return (row['layout'], row['problem'], row['algorithm'], row['heuristic'] or '')
+    baseline = dict((key(row), row) for row in baselineRows)
+
+    regressions = []
+    for row in rows:
+        old = baseline.get(key(row))
+        if old is None or old['status'] != 'ok':
+            continue
+        if row['status'] != 'ok':
+            regressions.append((row, 'status %s' % row['status']))
+            continue
+        if row['nodesExpanded'] > old['nodesExpanded']:
+            regressions.append((row, 'expanded %d -> %d' % (old['nodesExpanded'], row['nodesExpanded'])))
+        if row['pathCost'] > old['pathCost']:
+            regressions.append((row, 'path cost %s -> %s' % (old['pathCost'], row['pathCost'])))
+        if row['wallTime'] > old['wallTime'] * (1 + tolerance) and row['wallTime'] - old['wallTime'] > minTime:
+            regressions.append((row, 'wall time %.4f -> %.4f' % (old['wallTime'], row['wallTime'])))
+        if old.get('peakMemory') and row.get('peakMemory') and row['peakMemory'] > old['peakMemory'] * (1 + tolerance):
+            regressions.append((row, 'peak memory %d -> %d' % (old['peakMemory'], row['peakMemory'])))
+    return regressions
+
+
+def parseOptions():
+    optParser = optparse.OptionParser()
+    optParser.add_option('-l', '--layouts', action='store', dest='layouts', default=None,
+                         help='Comma separated layout names (default: every layout in layouts/)')
+    optParser.add_option('-p', '--problems', action='store', dest='problems', default=','.join(PROBLEMS),
+                         help='Comma separated search problems (default %default)')
+    optParser.add_option('-a', '--algorithms', action='store', dest='algorithms', default=','.join(ALGORITHMS),
+                         help='Comma separated search functions (default %default)')
+    optParser.add_option('-t', '--trials', action='store', type='int', dest='trials', default=3,
+                         help='Timed runs per combination (default %default)')
+    optParser.add_option('--timeLimit', action='store', type='int', dest='timeLimit', default=5,
+                         help='Seconds before a single run is abandoned (default %default)')
+    optParser.add_option('-o', '--output', action='store', dest='output', default=None,
+                         help='Write the results to this .csv or .json file')
+    optParser.add_option('-c', '--compare', action='store', dest='compare', default=None,
+                         help='Compare the results with this .csv or .json results file')
+    optParser.add_option('--tolerance', action='store', type='float', dest='tolerance', default=0.25,
+                         help='Allowed relative increase of time and memory in compare mode (default %default)')
+    opts, args = optParser.parse_args()
+
+    if opts.layouts is None:
+        opts.layouts = sorted(name[:-4] for name in os.listdir('layouts') if name.endswith('.lay'))
+    else:
+        opts.layouts = opts.layouts.split(',')
+    opts.problems = opts.problems.split(',')
+    opts.algorithms = opts.algorithms.split(',')
+    return opts
+
+
+if __name__ == '__main__':
+    opts = parseOptions()
+    rows = runBenchmark(opts)
+    if opts.output:
+        writeResults(rows, opts.output)
+    if opts.compare:
+        regressions = findRegressions(rows, readResults(opts.compare), opts.tolerance)
+        for row, reason in regressions:
+            print('REGRESSION %s %s %s %s: %s' % (row['layout'], row['problem'], row['algorithm'],
+                                                 row['heuristic'], reason))
+        print('%d regressions against %s' % (len(regressions), opts.compare))
+        if regressions:
+            raise SystemExit(1)
@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+from array import array
 
 
 class FixedRandom:
@@ -222,6 +223,180 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class IndexedPriorityQueue(PriorityQueue):
+    """
+    A PriorityQueue that holds at most one entry per item and keeps an
+    item -> heap slot index alongside the heap.  This makes update
+    (decrease-key), push and pop O(log n) and contains/priorityOf O(1),
+    instead of the linear scan plus heapify done by PriorityQueue.update.
+
+    Items must be hashable.  Ties are broken in insertion order, exactly as
+    in PriorityQueue, so both queues pop the same sequence of items.
+    """
+
+    def __init__(self):
+        PriorityQueue.__init__(self)
+        self.index = {}
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def push(self, item, priority):
+        "Adds an item, or moves it to 'priority' if it is already queued"
+        entry = (priority, self.count, item)
+        self.count += 1
+        if item in self.index:
+            pos = self.index[item]
+            self.heap[pos] = entry
+            self._siftUp(pos)
+            self._siftDown(self.index[item])
+        else:
+            self.heap.append(entry)
+            self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if not heap:
+            del self.index[last[2]]
+            return last[2]
+        (_, _, item) = heap[0]
+        del self.index[item]
+        heap[0] = last
+        self._siftDown(0)
+        return item
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update: lower the priority of a
+        # queued item, ignore a higher one, and push the item if it is absent.
+        pos = self.index.get(item)
+        if pos is None:
+            self.push(item, priority)
+            return
+        (p, c, _) = self.heap[pos]
+        if p <= priority:
+            return
+        self.heap[pos] = (priority, c, item)
+        self._siftUp(pos)
+
+    def contains(self, item):
+        return item in self.index
+
+    def priorityOf(self, item):
+        "Returns the priority of a queued item; raises KeyError otherwise"
+        return self.heap[self.index[item]][0]
+
+    def _siftUp(self, pos):
+        heap, index = self.heap, self.index
+        entry = heap[pos]
+        while pos > 0:
+            parentPos = (pos - 1) >> 1
+            parent = heap[parentPos]
+            if not entry < parent:
+                break
+            heap[pos] = parent
+            index[parent[2]] = pos
+            pos = parentPos
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+    def _siftDown(self, pos):
+        heap, index = self.heap, self.index
+        end = len(heap)
+        entry = heap[pos]
+        child = 2 * pos + 1
+        while child < end:
+            right = child + 1
+            if right < end and heap[right] < heap[child]:
+                child = right
+            if not heap[child] < entry:
+                break
+            heap[pos] = heap[child]
+            index[heap[pos][2]] = pos
+            pos = child
+            child = 2 * pos + 1
+        heap[pos] = entry
+        index[entry[2]] = pos
+
+
+class IndexedPriorityQueueWithFunction(IndexedPriorityQueue):
+    """
+    The IndexedPriorityQueue counterpart of PriorityQueueWithFunction: push
+    takes only the item and asks the priority function for its priority.
+    """
+
+    def __init__(self, priorityFunction):
+        "priorityFunction (item) -> priority"
+        self.priorityFunction = priorityFunction
+        IndexedPriorityQueue.__init__(self)
+
+    def push(self, item):
+        "Adds an item to the queue with priority from the priority function"
+        IndexedPriorityQueue.push(self, item, self.priorityFunction(item))
+
+class SearchNodeStore:
+    """
+    Holds the nodes of a search tree in parallel arrays instead of one tuple
+    per node.  Each node records the index of its parent, the action that led
+    to it and its path cost g, so the list of actions is rebuilt only once,
+    when a goal is reached, instead of being copied on every push.
+
+    Fringes hold (state, parent, action, stepCost) entries of constant size;
+    a node is only added to the store once it is popped for expansion, so the
+    store grows with the number of expanded states, not generated ones.
+    """
+    ROOT = -1
+
+    def __init__(self):
+        self.states = []
+        self.actions = []
+        self.parents = array('l')
+        self.costs = array('d')
+
+    def __len__(self):
+        return len(self.states)
+
+    def addNode(self, state, parent=ROOT, action=None, stepCost=0):
+        """
+        Adds a child of node 'parent' reached by 'action' and returns its index.
+        The node's path cost is the parent's cost plus stepCost.
+        """
+        if parent != -1:
+            stepCost += self.costs[parent]
+        self.states.append(state)
+        self.actions.append(action)
+        self.parents.append(parent)
+        self.costs.append(stepCost)
+        return len(self.parents) - 1
+
+    def getState(self, node):
+        return self.states[node]
+
+    def getParent(self, node):
+        return self.parents[node]
+
+    def getCost(self, node):
+        "Returns the path cost g of a node; the root has cost 0"
+        if node == -1:
+            return 0
+        return self.costs[node]
+
+    def getPath(self, node, action=None):
+        """
+        Returns the list of actions leading from the root to 'node', followed
+        by 'action' if one is given (for a goal that was never stored).
+        """
+        path = [] if action is None else [action]
+        parents, actions = self.parents, self.actions
+        while node != -1 and parents[node] != -1:
+            path.append(actions[node])
+            node = parents[node]
+        path.reverse()
+        return path
+
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )